@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+差分審査用のソフトウェアごとの指紋
+JVNの件数・最新項目日付、最新コミットSHA、最新リリースタグを保存し、
+前回から変化がないソフトウェアの再審査を省略できるようにします
+"""
+
+import os
+import json
+import tempfile
+import threading
+from datetime import datetime
+
+DEFAULT_STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "audit_fingerprints.json")
+
+class FingerprintStore:
+    """指紋をJSONファイルに保存するストア"""
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path: 指紋JSONファイルのパス
+        """
+        self.path = path or DEFAULT_STORE_PATH
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self._data = {}
+
+    @staticmethod
+    def make(jvn, github, has_repo_url):
+        """
+        指紋を組み立てる
+
+        Args:
+            jvn: JVNChecker.probe の戻り値
+            github: GitHubUpdateChecker.probe の戻り値（GitHub URLなし・取得失敗はNone）
+            has_repo_url: GitHub URLがあるか（URLなしと取得失敗を区別する）
+        """
+        return {
+            'jvn': jvn,
+            'commit_sha': (github or {}).get('commit_sha'),
+            'release_tag': (github or {}).get('release_tag'),
+            'github_probe_failed': has_repo_url and github is None,
+        }
+
+    def unchanged_since(self, software_name, fingerprint):
+        """
+        前回の指紋と一致すれば、その指紋を最初に記録した日時を返す
+
+        取得に失敗した項目（None）を含む指紋は常に「変化あり」とみなす
+        """
+        if fingerprint['jvn'] is None or fingerprint['github_probe_failed']:
+            return None
+        entry = self._data.get(software_name)
+        if not entry or entry.get('fingerprint') != fingerprint:
+            return None
+        return entry.get('since')
+
+    def last_report(self, software_name):
+        """前回の審査レポートのパスと合否"""
+        entry = self._data.get(software_name) or {}
+        return entry.get('report_path'), entry.get('passed')
+
+    def record_audit(self, software_name, fingerprint, report_path, passed):
+        """全チェックを実施した結果を記録（指紋がNoneなら次回の差分審査では必ず再審査する）"""
+        now = datetime.now().isoformat(timespec='seconds')
+        with self._lock:
+            self._data[software_name] = {
+                'fingerprint': fingerprint,
+                'since': now,
+                'last_checked': now,
+                'report_path': report_path,
+                'passed': passed,
+            }
+
+    def record_unchanged(self, software_name):
+        """変化なしで再審査を省略したことを記録"""
+        with self._lock:
+            self._data[software_name]['last_checked'] = datetime.now().isoformat(timespec='seconds')
+
+    def save(self):
+        """一時ファイルに書いてから置き換える"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._lock:
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self._data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ソフトウェアリスト一括審査
+software_list.txt の全エントリを1プロセスで審査し、JVNチェックとGitHubチェックを
+サービスごとの並列数上限つきで同時に実行します。
+レポートは software_audit.sh と同じ audit_reports/audit_<名前>_<日時>.txt 形式で出力します
+"""
+
+import io
+import os
+import sys
+import getpass
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from check_jvn import JVNChecker
+from check_updates import GitHubUpdateChecker, read_software_list
+from audit_fingerprints import FingerprintStore
+from audit_store import AuditStore, PASS, FAIL
+
+REPORT_DIR = "audit_reports"
+RULE = "=" * 80
+SECTION_RULE = "-" * 40
+
+# ============================================
+# スレッドごとの標準出力の取り込み
+# ============================================
+class _ThreadLocalStdout:
+    """スレッドごとに出力先を切り替えられる標準出力（未設定のスレッドは元の出力へ）"""
+
+    def __init__(self, original):
+        self._original = original
+        self._local = threading.local()
+
+    def _target(self):
+        return getattr(self._local, 'buffer', None) or self._original
+
+    def write(self, text):
+        return self._target().write(text)
+
+    def flush(self):
+        self._target().flush()
+
+    def capture(self, func, *args, **kwargs):
+        """funcの実行中にこのスレッドが出力した内容を取り込み、(戻り値, 出力) を返す"""
+        self._local.buffer = io.StringIO()
+        try:
+            result = func(*args, **kwargs)
+            return result, self._local.buffer.getvalue()
+        finally:
+            self._local.buffer = None
+
+    def __getattr__(self, name):
+        return getattr(self._original, name)
+
+
+def _capture_stdout():
+    if not isinstance(sys.stdout, _ThreadLocalStdout):
+        sys.stdout = _ThreadLocalStdout(sys.stdout)
+    return sys.stdout
+
+# ============================================
+# 各チェック
+# ============================================
+def run_jvn_check(checker, software_name):
+    """JVNDBチェック（check_jvn.py と同じ出力）"""
+    result = checker.check_vulnerabilities(software_name)
+    checker.print_report(result)
+    return result
+
+def run_github_check(checker, repo_url, prefetched):
+    """更新頻度チェック（check_updates.py と同じ出力。取得失敗時はNone）"""
+    return checker.check_github_updates(repo_url, prefetched=prefetched)
+
+# ============================================
+# レポート出力
+# ============================================
+def write_report(software_name, audited_at, jvn, github, reports_dir=REPORT_DIR, audit_store=None):
+    """
+    software_audit.sh と同じ形式でレポートを書き出し、審査結果ストアにも記録する
+
+    Args:
+        jvn: (JVNChecker.check_vulnerabilities の結果, 出力)
+        github: (check_github_updates の結果, 出力) または None（GitHub URLなし）
+        audit_store: AuditStore（Noneなら既定のパス）
+    """
+    os.makedirs(reports_dir, exist_ok=True)
+    timestamp = audited_at.strftime('%Y%m%d_%H%M%S')
+    report_path = os.path.join(reports_dir, f"audit_{software_name.replace(' ', '_')}_{timestamp}.txt")
+
+    jvn_result, jvn_output = jvn
+    jvn_passed = jvn_result.get('passed', False)
+    github_result = github[0] if github else None
+    github_passed = github_result is not None and github_result['is_active']
+    overall_pass = jvn_passed and (github is None or github_passed)
+
+    lines = [
+        RULE,
+        "ソフトウェア審査レポート",
+        RULE,
+        f"対象ソフトウェア: {software_name}",
+        f"審査実施日時: {audited_at.strftime('%Y年%m月%d日 %H:%M:%S')}",
+        f"審査担当: {getpass.getuser()}",
+        RULE,
+        "",
+        "",
+        "■ 1. JVNDBチェック",
+        SECTION_RULE,
+    ]
+    body = "\n".join(lines) + "\n" + jvn_output
+    body += "\n■ 2. 更新頻度チェック\n" + SECTION_RULE + "\n"
+    if github is None:
+        body += "  ⚠️  GitHub URLが指定されていません\n"
+    else:
+        body += github[1]
+    body += "\n" + RULE + "\n"
+    body += f"総合判定: {PASS if overall_pass else FAIL}\n"
+    body += RULE + "\n"
+
+    with open(report_path, 'w', encoding='utf-8') as f:
+        f.write(body)
+
+    (audit_store or AuditStore()).record(
+        software_name, audited_at, PASS if overall_pass else FAIL,
+        jvn_result=PASS if jvn_passed else FAIL,
+        github_result=None if github is None else (PASS if github_passed else FAIL),
+        vuln_count=jvn_result.get('vulnerability_count'),
+        commit_count=github_result['commit_count'] if github_result else None,
+        release_count=github_result['release_count'] if github_result else None,
+        report_path=report_path,
+    )
+
+    return report_path, overall_pass
+
+# ============================================
+# 一括審査
+# ============================================
+def _run_full_checks(entries, jvn_checker, github_checker, github_init_output,
+                     jvn_pool, github_pool, stdout, audited_at, reports_dir):
+    """JVN・GitHubの全チェックを並行して実行し、レポートを書き出す"""
+    repo_urls = [url for _, url in entries if url]
+
+    jvn_futures = {
+        name: jvn_pool.submit(stdout.capture, run_jvn_check, jvn_checker, name)
+        for name, _ in entries
+    }
+
+    # GitHubはGraphQLで一括取得してから各リポジトリを判定（JVNチェックと並行）
+    prefetched = github_pool.submit(github_checker.prefetch, repo_urls).result() if repo_urls else {}
+    github_futures = {
+        url: github_pool.submit(stdout.capture, run_github_check, github_checker, url, prefetched[url])
+        for url in repo_urls
+    }
+
+    audit_store = AuditStore()
+    results = []
+    for name, url in entries:
+        jvn = jvn_futures[name].result()
+        github = None
+        if url:
+            result, output = github_futures[url].result()
+            github = (result, github_init_output + output)
+        report_path, overall_pass = write_report(name, audited_at, jvn, github, reports_dir, audit_store)
+        results.append((name, report_path, overall_pass))
+    return results
+
+def audit_software_list(entries, jvn_workers=2, github_workers=4, reports_dir=REPORT_DIR,
+                        incremental=False, store=None):
+    """
+    全エントリを審査
+
+    Args:
+        entries: [(ソフトウェア名, GitHub URL)]
+        jvn_workers: JVNDBへの同時問い合わせ数
+        github_workers: GitHubチェックの同時実行数
+        incremental: 指紋が前回から変化していないソフトウェアは再審査しない
+        store: FingerprintStore（Noneなら既定のパス）
+
+    Returns:
+        list: [(ソフトウェア名, レポートパス, 合否, 変化なしの起点日時 または None)]
+    """
+    stdout = _capture_stdout()
+    audited_at = datetime.now()
+
+    jvn_checker = JVNChecker()
+    github_checker, github_init_output = stdout.capture(GitHubUpdateChecker)
+    store = store or FingerprintStore()
+
+    with ThreadPoolExecutor(max_workers=jvn_workers) as jvn_pool, \
+            ThreadPoolExecutor(max_workers=github_workers) as github_pool:
+        # 差分審査のときだけ軽量な問い合わせで指紋を取得（GitHubはETagにより変化がなければ304）
+        fingerprints = {name: None for name, _ in entries}
+        skipped = {}
+        if incremental:
+            jvn_probes = {name: jvn_pool.submit(jvn_checker.probe, name) for name, _ in entries}
+            github_probes = {url: github_pool.submit(github_checker.probe, url) for _, url in entries if url}
+            fingerprints = {
+                name: FingerprintStore.make(
+                    jvn_probes[name].result(),
+                    github_probes[url].result() if url else None,
+                    bool(url),
+                )
+                for name, url in entries
+            }
+            for name, _ in entries:
+                since = store.unchanged_since(name, fingerprints[name])
+                if since:
+                    skipped[name] = since
+
+        targets = [(name, url) for name, url in entries if name not in skipped]
+        full_results = _run_full_checks(
+            targets, jvn_checker, github_checker, github_init_output,
+            jvn_pool, github_pool, stdout, audited_at, reports_dir
+        )
+
+    audited = {name: (report_path, passed) for name, report_path, passed in full_results}
+    results = []
+    for name, _ in entries:
+        if name in skipped:
+            store.record_unchanged(name)
+            report_path, passed = store.last_report(name)
+            results.append((name, report_path, passed, skipped[name]))
+        else:
+            report_path, passed = audited[name]
+            store.record_audit(name, fingerprints[name], report_path, passed)
+            results.append((name, report_path, passed, None))
+    store.save()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="software_list.txt の一括審査")
+    parser.add_argument("list_path", nargs="?", default="software_list.txt", help="ソフトウェアリストのパス")
+    parser.add_argument("--jvn-workers", type=int, default=2, help="JVNDBへの同時問い合わせ数（デフォルト: 2）")
+    parser.add_argument("--github-workers", type=int, default=4, help="GitHubチェックの同時実行数（デフォルト: 4）")
+    parser.add_argument("--incremental", action="store_true", help="前回から変化のないソフトウェアは再審査しない")
+    args = parser.parse_args()
+
+    entries = read_software_list(args.list_path)
+    if not entries:
+        print(f"❌ 審査対象がありません: {args.list_path}")
+        return 1
+
+    print(f"[INFO] {len(entries)}件のソフトウェアを審査します")
+    results = audit_software_list(
+        entries, args.jvn_workers, args.github_workers, incremental=args.incremental
+    )
+
+    print("")
+    print("==========================================")
+    for name, report_path, overall_pass, unchanged_since in results:
+        if unchanged_since:
+            print(f"⏭️  {name}: unchanged since {unchanged_since}（前回レポート: {report_path}）")
+        else:
+            print(f"{'✅' if overall_pass else '❌'} {name}: {report_path}")
+    print("==========================================")
+    passed = sum(1 for _, _, ok, _ in results if ok)
+    unchanged = sum(1 for _, _, _, since in results if since)
+    print(f"合格: {passed}件 / 不合格: {len(results) - passed}件 / 変化なしで省略: {unchanged}件")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
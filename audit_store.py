@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+審査結果ストア（SQLite）
+審査ごとにソフトウェア名・日時・チェックごとの判定・件数・レポートパスを1行で記録し、
+「ソフトウェアごとの最新結果」を索引で即座に取得できるようにします。
+取り込み済みのレポートファイルはパスと更新時刻の台帳で管理し、新規・変更分だけを解析します
+"""
+
+import os
+import re
+import sys
+import sqlite3
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+DEFAULT_STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "audit_results.sqlite3")
+
+PASS = "✅ 合格"
+FAIL = "❌ 不合格"
+
+# audit_<ソフトウェア名（空白は_）>_<YYYYmmdd_HHMMSS>.txt
+REPORT_FILE_PATTERN = re.compile(r'^audit_(.+)_(\d{8}_\d{6})\.txt$')
+
+class AuditStore:
+    """審査結果を保持するSQLiteストア"""
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path: SQLiteファイルのパス
+        """
+        self.path = path or DEFAULT_STORE_PATH
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS audits (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    software TEXT NOT NULL,
+                    audited_at TEXT NOT NULL,
+                    jvn_result TEXT,
+                    github_result TEXT,
+                    overall_result TEXT NOT NULL,
+                    vuln_count INTEGER,
+                    commit_count INTEGER,
+                    release_count INTEGER,
+                    report_path TEXT UNIQUE
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_audits_latest ON audits(software, audited_at DESC)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS report_files (
+                    path TEXT PRIMARY KEY,
+                    mtime REAL NOT NULL
+                )
+            """)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def record(self, software, audited_at, overall_result, jvn_result=None, github_result=None,
+               vuln_count=None, commit_count=None, release_count=None, report_path=None):
+        """
+        審査結果を1行記録（同じレポートパスがあれば置き換え）
+
+        Args:
+            audited_at: 審査日時（datetime）
+            overall_result / jvn_result / github_result: PASS / FAIL（未実施はNone）
+        """
+        report_path = os.path.abspath(report_path) if report_path else None
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO audits (software, audited_at, jvn_result, github_result, overall_result, "
+                "vuln_count, commit_count, release_count, report_path) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (software, audited_at.isoformat(timespec='seconds'), jvn_result, github_result, overall_result,
+                 vuln_count, commit_count, release_count, report_path)
+            )
+            # 記録したレポートファイルは台帳にも載せ、次回以降の再解析を省く
+            if report_path and os.path.exists(report_path):
+                conn.execute(
+                    "INSERT OR REPLACE INTO report_files (path, mtime) VALUES (?, ?)",
+                    (report_path, os.path.getmtime(report_path))
+                )
+
+    def latest_per_software(self):
+        """ソフトウェアごとの最新の審査結果（ソフトウェア名順）"""
+        with self._connect() as conn:
+            return [dict(row) for row in conn.execute("""
+                SELECT a.* FROM audits a
+                WHERE a.id = (
+                    SELECT b.id FROM audits b
+                    WHERE b.software = a.software
+                    ORDER BY b.audited_at DESC, b.id DESC LIMIT 1
+                )
+                ORDER BY a.software
+            """)]
+
+    def count(self):
+        """記録されている審査の総数"""
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM audits").fetchone()[0]
+
+    def is_imported(self, report_path, mtime):
+        """レポートファイルが同じ更新時刻のまま取り込み済みか"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT mtime FROM report_files WHERE path = ?", (os.path.abspath(report_path),)
+            ).fetchone()
+        return row is not None and row['mtime'] == mtime
+
+# ============================================
+# テキストレポートの取り込み
+# ============================================
+def parse_report_text(content):
+    """
+    audit_*.txt の内容から審査結果を抽出
+
+    Returns:
+        dict: AuditStore.record の引数
+    """
+    name_match = re.search(r'対象ソフトウェア:\s*(.+)', content)
+    date_match = re.search(r'審査実施日時:\s*(\d{4})年(\d{2})月(\d{2})日 (\d{2}):(\d{2}):(\d{2})', content)
+    result_match = re.search(r'総合判定:\s*(.+)', content)
+    vuln_match = re.search(r'検出された脆弱性:\s*(\d+)件', content)
+    commit_match = re.search(r'コミット数（12ヶ月）:\s*(\d+)件', content)
+    release_match = re.search(r'リリース数（12ヶ月）:\s*(\d+)件', content)
+    jvn_match = re.search(r'判定:\s*(✅ 合格|❌ 不合格)\(脆弱性', content)
+    github_match = re.search(r'^判定:\s*(✅ 合格|❌ 不合格)$', content, re.MULTILINE)
+
+    return {
+        'software': name_match.group(1).strip() if name_match else 'Unknown',
+        'audited_at': datetime(*map(int, date_match.groups())) if date_match else datetime.fromtimestamp(0),
+        'overall_result': result_match.group(1).strip() if result_match else 'Unknown',
+        'jvn_result': jvn_match.group(1) if jvn_match else None,
+        'github_result': github_match.group(1) if github_match else None,
+        'vuln_count': int(vuln_match.group(1)) if vuln_match else None,
+        'commit_count': int(commit_match.group(1)) if commit_match else None,
+        'release_count': int(release_match.group(1)) if release_match else None,
+    }
+
+def import_report(store, report_path):
+    """テキストレポート1件をストアに取り込む"""
+    with open(report_path, 'r', encoding='utf-8') as f:
+        values = parse_report_text(f.read())
+    store.record(report_path=report_path, **values)
+    return values
+
+def scan_reports(reports_dir='audit_reports'):
+    """
+    レポートファイルを列挙（ファイルを開かずにファイル名だけで判別）
+
+    Returns:
+        list: [(ファイル名上のソフトウェア名, タイムスタンプ, os.DirEntry)]
+    """
+    try:
+        entries = os.scandir(reports_dir)
+    except FileNotFoundError:
+        return []
+    with entries:
+        return [
+            (match.group(1), match.group(2), entry)
+            for entry in entries
+            if (match := REPORT_FILE_PATTERN.match(entry.name)) and entry.is_file()
+        ]
+
+def latest_reports(scanned):
+    """ファイル名のタイムスタンプでソフトウェアごとの最新レポートを選ぶ"""
+    latest = {}
+    for name, timestamp, entry in scanned:
+        if name not in latest or timestamp > latest[name][0]:
+            latest[name] = (timestamp, entry)
+    return [entry for _, entry in latest.values()]
+
+def import_reports(store, reports_dir='audit_reports', latest_only=False, scanned=None):
+    """
+    テキストレポートを取り込む（台帳と更新時刻が一致するものは開かない）
+
+    Args:
+        latest_only: ソフトウェアごとの最新レポートだけを対象にする
+        scanned: scan_reports の結果（Noneなら reports_dir を列挙）
+
+    Returns:
+        int: 取り込んだ件数
+    """
+    if scanned is None:
+        scanned = scan_reports(reports_dir)
+    entries = latest_reports(scanned) if latest_only else [entry for _, _, entry in scanned]
+    imported = 0
+    for entry in sorted(entries, key=lambda e: e.name):
+        if store.is_imported(entry.path, entry.stat().st_mtime):
+            continue
+        import_report(store, entry.path)
+        imported += 1
+    return imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description="審査結果ストア")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser("import", help="テキストレポートを取り込む")
+    import_parser.add_argument("paths", nargs="*", help="レポートファイル（省略時は audit_reports/ 全体）")
+
+    args = parser.parse_args()
+    store = AuditStore()
+
+    if args.command == "import":
+        if args.paths:
+            for path in args.paths:
+                import_report(store, Path(path))
+            print(f"✅ {len(args.paths)}件のレポートを取り込みました")
+        else:
+            imported = import_reports(store)
+            print(f"✅ {imported}件のレポートを取り込みました（総数: {store.count()}件）")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
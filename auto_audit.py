@@ -6,17 +6,40 @@
 
 import sys
 import json
+import argparse
 import os
 import csv
-import requests
+import time
+import threading
+import http_client
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from io import StringIO
+from search_cache import SearchCache
+from jvn_mirror import lookup_local
+from jvn_feed import count_vuln_overview
 
 # ============================================
 # 設定
 # ============================================
 SERPAPI_KEY = os.environ.get('SERPAPI_KEY', '')  # 環境変数から取得
 
+# SerpAPI結果キャッシュ（TTL秒・最大件数・無効化フラグ）
+SERPAPI_CACHE_TTL = int(os.environ.get('SERPAPI_CACHE_TTL', str(7 * 24 * 3600)))
+SERPAPI_CACHE_MAX_ENTRIES = int(os.environ.get('SERPAPI_CACHE_MAX_ENTRIES', '5000'))
+SERPAPI_CACHE_BYPASS = os.environ.get('SERPAPI_CACHE_BYPASS', '') == '1'
+
+_search_cache = None
+_search_cache_lock = threading.Lock()
+
+def get_search_cache():
+    """SerpAPIキャッシュを取得（初回のみ生成、並列検索から同時に呼ばれても1つだけ作る）"""
+    global _search_cache
+    with _search_cache_lock:
+        if _search_cache is None:
+            _search_cache = SearchCache(ttl_seconds=SERPAPI_CACHE_TTL, max_entries=SERPAPI_CACHE_MAX_ENTRIES)
+        return _search_cache
+
 # ============================================
 # CSV解析
 # ============================================
@@ -56,8 +79,8 @@ def parse_csv(csv_path):
 # ============================================
 # Web検索（SerpAPI使用）
 # ============================================
-def search_web(query, num_results=5):
-    """Web検索を実行"""
+def search_web(query, num_results=5, use_cache=None):
+    """Web検索を実行（結果はSerpAPIキャッシュを経由）"""
     if not SERPAPI_KEY:
         return {
             "status": "no_api_key",
@@ -65,6 +88,9 @@ def search_web(query, num_results=5):
             "results": []
         }
     
+    if use_cache is None:
+        use_cache = not SERPAPI_CACHE_BYPASS
+    
     try:
         url = "https://serpapi.com/search"
         params = {
@@ -75,7 +101,19 @@ def search_web(query, num_results=5):
             "gl": "jp"
         }
         
-        response = requests.get(url, params=params, timeout=10)
+        cache = get_search_cache() if use_cache else None
+        cached = cache.get(params) if cache else None
+        if cached:
+            results, cached_at = cached
+            cached_label = datetime.fromtimestamp(cached_at).strftime('%Y-%m-%d %H:%M:%S')
+            return {
+                "status": "success",
+                "query": query,
+                "cached": True,
+                "results": [dict(item, キャッシュ=f"{cached_label} 取得") for item in results]
+            }
+        
+        response = http_client.get(url, params=params, timeout=10)
         response.raise_for_status()
         data = response.json()
         
@@ -87,9 +125,13 @@ def search_web(query, num_results=5):
                 "snippet": item.get("snippet", "")
             })
         
+        if cache:
+            cache.put(params, results)
+        
         return {
             "status": "success",
             "query": query,
+            "cached": False,
             "results": results
         }
     except Exception as e:
@@ -103,12 +145,22 @@ def search_web(query, num_results=5):
 # JVN iPedia検索（脆弱性データベース）
 # ============================================
 def search_jvn(software_name):
-    """JVN iPediaで脆弱性情報を検索"""
+    """JVN iPediaで脆弱性情報を検索（同期済みのローカルミラーを優先）"""
+    search_url = f"https://jvndb.jvn.jp/search/index.php?mode=_vulnerability_search_IA_VulnSearch&keyword={software_name}"
+    
+    local = lookup_local(software_name, years=5)
+    if local is not None:
+        return {
+            "status": "success",
+            "source": "local_mirror",
+            "vulnerability_count": len(local),
+            "search_url": search_url,
+            "message": f"過去5年間で{len(local)}件の脆弱性報告"
+        }
+    
     try:
         # JVN iPediaのAPI（MyJVN）を使用
-        url = "https://jvndb.jvn.jp/myjvn"
         params = {
-            "method": "getVulnOverviewList",
             "keyword": software_name,
             "rangeDatePublished": "n",
             "rangeDateFirstPublished": "n",
@@ -116,24 +168,59 @@ def search_jvn(software_name):
             "feed": "hnd"
         }
         
-        response = requests.get(url, params=params, timeout=10)
-        
-        # 簡易的な件数カウント（実際はXMLパース必要）
-        vuln_count = response.text.count("<item>")
+        # 件数のみ取得（Statusの totalRes を使うので全ページを辿る必要はない）
+        vuln_count = count_vuln_overview(params, timeout=10)
         
         return {
             "status": "success",
+            "source": "myjvn",
             "vulnerability_count": vuln_count,
-            "search_url": f"https://jvndb.jvn.jp/search/index.php?mode=_vulnerability_search_IA_VulnSearch&keyword={software_name}",
+            "search_url": search_url,
             "message": f"過去5年間で{vuln_count}件の脆弱性報告"
         }
     except Exception as e:
+        # MyJVN障害時は古いミラーでも同期済みであれば利用する
+        local = lookup_local(software_name, years=5, allow_stale=True)
+        if local is not None:
+            return {
+                "status": "success",
+                "source": "local_mirror",
+                "vulnerability_count": len(local),
+                "search_url": search_url,
+                "message": f"過去5年間で{len(local)}件の脆弱性報告（MyJVN接続エラーのためローカルミラーを使用）"
+            }
         return {
             "status": "error",
             "message": str(e),
             "vulnerability_count": "不明"
         }
 
+# ============================================
+# 並列実行エンジン
+# ============================================
+def _timed_call(func, args, kwargs):
+    """関数を実行し、(結果, 所要秒数) を返す"""
+    started = time.monotonic()
+    result = func(*args, **kwargs)
+    return result, round(time.monotonic() - started, 3)
+
+def run_lookups_concurrently(tasks, max_workers=3):
+    """
+    複数の検索を同時に開始し、全て完了するまで待つ
+    
+    Args:
+        tasks: {キー: (関数, 位置引数タプル, キーワード引数dict)}
+    
+    Returns:
+        {キー: (結果, 所要秒数)} （tasksと同じキー順）
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            key: executor.submit(_timed_call, func, args, kwargs)
+            for key, (func, args, kwargs) in tasks.items()
+        }
+        return {key: future.result() for key, future in futures.items()}
+
 # ============================================
 # 自動審査ロジック
 # ============================================
@@ -149,11 +236,23 @@ def conduct_audit(info):
     }
     
     # ----------------------------------------
-    # 審査1: セキュリティ事故報告の確認
+    # 外部検索を並列実行（所要時間は最も遅い1件に揃う）
     # ----------------------------------------
-    print(f"[審査1] セキュリティ事故報告を確認中...")
-    incident_search = search_web(f"{software_name} セキュリティ インシデント 情報漏洩", num_results=3)
+    print(f"[審査1-3] セキュリティ事故報告・脆弱性情報・提供元の評判を並列で確認中...")
+    lookups = run_lookups_concurrently({
+        "incident": (search_web, (f"{software_name} セキュリティ インシデント 情報漏洩",), {"num_results": 3}),
+        "jvn": (search_jvn, (software_name,), {}),
+        "reputation": (search_web, (f"{software_name} 評判 レビュー",), {"num_results": 3}),
+    })
+    incident_search, _ = lookups["incident"]
+    jvn_result, _ = lookups["jvn"]
+    reputation_search, _ = lookups["reputation"]
+    
+    audit_result["チェック所要時間"] = {key: elapsed for key, (_, elapsed) in lookups.items()}
     
+    # ----------------------------------------
+    # 審査1: セキュリティ事故報告の確認
+    # ----------------------------------------
     # 判定ロジック（簡易版）
     incident_keywords = ["情報漏洩", "セキュリティ侵害", "脆弱性", "ハッキング", "不正アクセス"]
     incident_found = False
@@ -176,12 +275,13 @@ def conduct_audit(info):
     # ----------------------------------------
     # 審査2: 脆弱性データベース確認
     # ----------------------------------------
-    print(f"[審査2] 脆弱性情報を確認中...")
-    jvn_result = search_jvn(software_name)
-    
     vuln_count = jvn_result.get("vulnerability_count", 0)
     
-    if "有償" in is_paid:
+    if not isinstance(vuln_count, int):
+        # MyJVN もローカルミラーも使えず件数が取れなかった場合（"不明"）
+        vuln_judgement = "不明"
+        vuln_reason = f"脆弱性件数を取得できませんでした（{jvn_result.get('message', '')}）。手動で確認してください"
+    elif "有償" in is_paid:
         # 有償ソフト: 5年で10件以上は要注意
         vuln_judgement = "要注意" if vuln_count >= 10 else "問題なし"
         vuln_reason = f"過去5年間で{vuln_count}件の脆弱性報告（10件以上は要注意）"
@@ -202,9 +302,6 @@ def conduct_audit(info):
     # ----------------------------------------
     # 審査3: 提供元の評判確認
     # ----------------------------------------
-    print(f"[審査3] 提供元の評判を確認中...")
-    reputation_search = search_web(f"{software_name} 評判 レビュー", num_results=3)
-    
     # 簡易判定
     negative_keywords = ["危険", "注意", "おすすめしない", "問題", "トラブル"]
     negative_found = False
@@ -232,6 +329,9 @@ def conduct_audit(info):
     if "要注意" in judgements:
         final_judgement = "条件付き承認"
         final_reason = "一部の審査項目で要注意事項あり。詳細確認の上、条件付きで承認可能"
+    elif "不明" in judgements:
+        final_judgement = "条件付き承認"
+        final_reason = "一部の審査項目を確認できず。手動で確認の上、条件付きで承認可能"
     else:
         final_judgement = "承認"
         final_reason = "全ての審査項目で問題なし"
@@ -276,7 +376,7 @@ def generate_report(info, audit_result, output_path):
 """
     
     for idx, item in enumerate(audit_result.get("審査項目", []), 1):
-        status_icon = "⚠️" if item["判定"] == "要注意" else "✅"
+        status_icon = {"要注意": "⚠️", "不明": "❓"}.get(item["判定"], "✅")
         
         report += f"""### {status_icon} 審査{idx}: {item['項目名']}
 
@@ -290,8 +390,9 @@ def generate_report(info, audit_result, output_path):
             title = evidence.get("title", "")
             url = evidence.get("url", "")
             snippet = evidence.get("snippet", "")
+            cached_note = f"（キャッシュ: {evidence['キャッシュ']}）" if evidence.get("キャッシュ") else ""
             report += f"""
-- **{title}**  
+- **{title}**{cached_note}  
   URL: {url}  
   概要: {snippet}
 """
@@ -321,25 +422,21 @@ def generate_report(info, audit_result, output_path):
         f.write(report)
 
 # ============================================
-# メイン処理
+# 1ファイル審査
 # ============================================
-def main():
-    if len(sys.argv) < 2:
-        print("使い方: python3 auto_audit.py [CSVファイルパス]", file=sys.stderr)
-        sys.exit(1)
+def audit_csv_file(csv_path, script_dir=None):
+    """
+    CSV1件を審査し、JSON結果とMarkdownレポートを保存
     
-    csv_path = sys.argv[1]
-    
-    # CSV解析
-    print("=" * 60)
-    print("ソフトウェアセキュリティ自動審査システム")
-    print("=" * 60)
-    print(f"\n📄 CSVファイル: {csv_path}\n")
+    Returns:
+        dict: ソフトウェア名・総合判定・出力パス
     
+    Raises:
+        ValueError: CSV解析に失敗した場合
+    """
     info = parse_csv(csv_path)
     if not info:
-        print("エラー: CSV解析に失敗しました", file=sys.stderr)
-        sys.exit(1)
+        raise ValueError(f"CSV解析に失敗しました: {csv_path}")
     
     software_name = info.get("ソフトウェア名", "")
     print(f"🔍 審査対象: {software_name}\n")
@@ -348,7 +445,7 @@ def main():
     audit_result = conduct_audit(info)
     
     # 結果保存
-    script_dir = os.path.dirname(os.path.abspath(__file__))
+    script_dir = script_dir or os.path.dirname(os.path.abspath(__file__))
     reports_dir = os.path.join(script_dir, "reports")
     results_dir = os.path.join(script_dir, "audit_results")
     os.makedirs(reports_dir, exist_ok=True)
@@ -369,12 +466,125 @@ def main():
     report_path = os.path.join(reports_dir, f"審査レポート_{basename}_{timestamp}.md")
     generate_report(info, audit_result, report_path)
     
+    return {
+        "ソフトウェア名": software_name,
+        "総合判定": audit_result.get("総合判定", ""),
+        "json_path": json_path,
+        "report_path": report_path
+    }
+
+# ============================================
+# バッチ処理（1プロセス内で並列実行）
+# ============================================
+def run_batch(csv_dir, workers=4):
+    """
+    ディレクトリ内の全CSVをワーカープールで審査し、バッチサマリーを保存
+    
+    Returns:
+        dict: バッチサマリー
+    """
+    csv_files = sorted(
+        os.path.join(csv_dir, name) for name in os.listdir(csv_dir)
+        if name.lower().endswith(".csv")
+    )
+    
+    started_at = datetime.now()
+    started = time.monotonic()
+    files = []
+    
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = [(path, executor.submit(audit_csv_file, path)) for path in csv_files]
+        for idx, (path, future) in enumerate(futures, 1):
+            name = os.path.basename(path)
+            try:
+                outcome = future.result()
+                files.append({"ファイル": name, "状態": "成功", **outcome})
+                print(f"[{idx}/{len(csv_files)}] ✅ {name}: {outcome['総合判定']}")
+            except Exception as e:
+                files.append({"ファイル": name, "状態": "エラー", "エラー": str(e)})
+                print(f"[{idx}/{len(csv_files)}] ❌ {name}: {e}", file=sys.stderr)
+    
+    success_count = sum(1 for f in files if f["状態"] == "成功")
+    summary = {
+        "実行日時": started_at.isoformat(),
+        "対象ディレクトリ": os.path.abspath(csv_dir),
+        "ワーカー数": workers,
+        "総数": len(files),
+        "成功": success_count,
+        "エラー": len(files) - success_count,
+        "所要時間": round(time.monotonic() - started, 3),
+        "SerpAPIキャッシュ": _search_cache.stats() if _search_cache else None,
+        "HTTP統計": http_client.metrics(),
+        "ファイル": files
+    }
+    
+    results_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "audit_results")
+    os.makedirs(results_dir, exist_ok=True)
+    summary_path = os.path.join(results_dir, f"バッチ結果_{started_at.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    summary["summary_path"] = summary_path
+    
+    return summary
+
+# ============================================
+# メイン処理
+# ============================================
+def print_cache_stats():
+    """SerpAPIキャッシュのヒット/ミス件数を表示"""
+    if _search_cache is None:
+        return
+    stats = _search_cache.stats()
+    print(f"🗂️  SerpAPIキャッシュ: ヒット {stats['hits']}件 / ミス {stats['misses']}件 (ヒット率 {stats['hit_rate']:.0%})\n")
+
+def main():
+    parser = argparse.ArgumentParser(description="ソフトウェアセキュリティ自動審査システム")
+    parser.add_argument("csv_path", nargs="?", help="審査するCSVファイルパス")
+    parser.add_argument("--batch", metavar="DIR", help="ディレクトリ内の全CSVを一括審査")
+    parser.add_argument("--workers", type=int, default=4, help="バッチ時の並列ワーカー数（デフォルト: 4）")
+    parser.add_argument("--no-cache", action="store_true", help="SerpAPIキャッシュを使わずに検索")
+    args = parser.parse_args()
+    
+    if args.no_cache:
+        global SERPAPI_CACHE_BYPASS
+        SERPAPI_CACHE_BYPASS = True
+    
+    if not args.csv_path and not args.batch:
+        print("使い方: python3 auto_audit.py [CSVファイルパス]", file=sys.stderr)
+        print("        python3 auto_audit.py --batch DIR [--workers N]", file=sys.stderr)
+        sys.exit(1)
+    
+    print("=" * 60)
+    print("ソフトウェアセキュリティ自動審査システム")
+    print("=" * 60)
+    
+    if args.batch:
+        print(f"\n📂 CSVディレクトリ: {args.batch} (ワーカー数: {args.workers})\n")
+        summary = run_batch(args.batch, args.workers)
+        
+        print("\n" + "=" * 60)
+        print(f"処理完了: 総数 {summary['総数']}件 / 成功 {summary['成功']}件 / エラー {summary['エラー']}件")
+        print("=" * 60)
+        print_cache_stats()
+        print(f"\n📊 バッチ結果 (JSON): {summary['summary_path']}\n")
+        sys.exit(0 if summary["エラー"] == 0 else 1)
+    
+    csv_path = args.csv_path
+    print(f"\n📄 CSVファイル: {csv_path}\n")
+    
+    try:
+        outcome = audit_csv_file(csv_path)
+    except ValueError:
+        print("エラー: CSV解析に失敗しました", file=sys.stderr)
+        sys.exit(1)
+    
     # 結果表示
     print("\n" + "=" * 60)
-    print(f"✅ 審査完了: {audit_result.get('総合判定', '')}")
+    print(f"✅ 審査完了: {outcome['総合判定']}")
     print("=" * 60)
-    print(f"\n📊 審査結果 (JSON): {json_path}")
-    print(f"📄 審査レポート (MD): {report_path}\n")
+    print(f"\n📊 審査結果 (JSON): {outcome['json_path']}")
+    print(f"📄 審査レポート (MD): {outcome['report_path']}\n")
+    print_cache_stats()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+審査ルール照合のベンチマーク
+ルール数（ベンダー・禁止カテゴリ・セキュリティキーワード）を増やしながら、
+従来のリスト走査とコンパイル済みルールの1件あたりの審査時間を比較します。
+ランダムな入力で両者の判定・理由・フラグが一致することも確認します
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+
+from workflow_audit import WorkflowAuditor
+
+def audit_application_linear(rules, app):
+    """従来の audit_application（リストを先頭から走査）"""
+    flags = []
+    reasons = []
+
+    try:
+        cost_str = app.get('コスト', '0円').replace('円', '').replace(',', '').replace('/', '年').split()[0]
+        cost = int(cost_str) if cost_str.isdigit() else 0
+    except:
+        cost = 0
+        flags.append('コスト不明')
+
+    vendor = app.get('ベンダー', '')
+    license_type = app.get('ライセンス形態', '')
+
+    if cost == 0 and '無料' in license_type:
+        if vendor in rules['auto_approve']['known_vendors']:
+            return 'approved', '信頼できるベンダーの無料ソフトウェア', flags
+
+    if cost <= rules['auto_approve']['max_cost_yen']:
+        reasons.append(f'低コスト({cost}円)')
+        flags.append('自動承認候補')
+
+    purpose = app.get('利用目的', '')
+    for prohibited in rules['auto_reject']['prohibited_categories']:
+        if prohibited in purpose or prohibited in app.get('ソフトウェア名', ''):
+            return 'rejected', f'禁止カテゴリ: {prohibited}', flags
+
+    if license_type in rules['auto_reject']['high_risk_licenses']:
+        return 'rejected', f'高リスクライセンス: {license_type}', flags
+
+    department = app.get('部署', '')
+
+    if cost > rules['require_manual_review']['high_cost_threshold']:
+        reasons.append(f'高額({cost}円)')
+        return 'manual_review', '高額のため手動審査が必要', reasons
+
+    if department in rules['require_manual_review']['sensitive_departments']:
+        reasons.append(f'機密部署: {department}')
+        return 'manual_review', '機密部署のため手動審査が必要', reasons
+
+    for keyword in rules['require_manual_review']['security_keywords']:
+        if keyword in purpose or keyword in app.get('備考', ''):
+            reasons.append(f'セキュリティキーワード: {keyword}')
+            return 'manual_review', 'セキュリティ要件のため手動審査が必要', reasons
+
+    return 'approved', '基準を満たしている', flags
+
+# ============================================
+# 合成データ
+# ============================================
+def _word(rng, length):
+    return ''.join(rng.choice('アイウエオカキクケコサシスセソタチツテトabcdefghij') for _ in range(length))
+
+def make_rules(size, rng):
+    """各リストを size 件に増やしたルール"""
+    return {
+        "auto_approve": {
+            "free_software": True,
+            "known_vendors": [f"Vendor {_word(rng, 8)}" for _ in range(size)] + ["Microsoft", "Google"],
+            "max_cost_yen": 10000
+        },
+        "auto_reject": {
+            "prohibited_categories": [_word(rng, 6) for _ in range(size)] + ["P2P"],
+            "high_risk_licenses": ["不明", "独自"]
+        },
+        "require_manual_review": {
+            "high_cost_threshold": 50000,
+            "sensitive_departments": ["経理部", "人事部"],
+            "security_keywords": [_word(rng, 5) for _ in range(size)] + ["VPN"]
+        }
+    }
+
+COSTS = ['0円', '5000円', '60000円', '12000円/年', '1,000円', '10000円', '10001円', '50001円',
+         '無料', '', '   ', '要見積', None]
+
+def make_rows(count, rules, rng):
+    """ランダムな申請（コストの書式ゆれ・列の欠落・キーワードの重なりを含む）"""
+    vendors = rules['auto_approve']['known_vendors']
+    keywords = rules['require_manual_review']['security_keywords']
+    prohibited = rules['auto_reject']['prohibited_categories']
+    rows = []
+    for i in range(count):
+        row = {
+            '申請ID': f'BENCH-{i}',
+            'ソフトウェア名': rng.choice([_word(rng, 10), f"{rng.choice(prohibited)}{_word(rng, 4)}"]),
+            'ベンダー': rng.choice([rng.choice(vendors), f"Other {_word(rng, 6)}"]),
+            '利用目的': rng.choice([
+                _word(rng, 20),
+                f"{_word(rng, 8)}{rng.choice(keywords)}{_word(rng, 8)}",
+                f"{rng.choice(keywords)}{rng.choice(prohibited)}",
+                "P2P共有",
+            ]),
+            'ライセンス形態': rng.choice(['無料/MIT', '無料プラン', '商用', '不明', '独自']),
+            'コスト': rng.choice(COSTS),
+            '部署': rng.choice(['開発部', '営業部', '経理部', '人事部']),
+            '備考': rng.choice([_word(rng, 30), f"{rng.choice(keywords)}あり"]),
+        }
+        # 列が欠落した行（既定値の扱いの確認）
+        for column in ('コスト', '備考', 'ベンダー'):
+            if rng.random() < 0.02:
+                del row[column]
+        rows.append(row)
+    return rows
+
+def bench(func, rows, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for row in rows:
+            func(row)
+        best = min(best, time.perf_counter() - start)
+    return best / len(rows) * 1e6  # マイクロ秒/件
+
+
+def run(args, workdir):
+    rng = random.Random(0)
+    cache_dir = os.path.join(workdir, "compiled_rules")
+
+    if not args.check:
+        print(f"{'ルール数':>8}  {'従来(μs/件)':>12}  {'コンパイル済み(μs/件)':>20}  {'倍率':>6}")
+        print("-" * 56)
+    for size in args.sizes:
+        rules = make_rules(size, rng)
+        config_path = os.path.join(workdir, f"rules_{size}.json")
+        with open(config_path, 'w', encoding='utf-8') as f:
+            json.dump(rules, f, ensure_ascii=False)
+        auditor = WorkflowAuditor(config_path, rules_cache_dir=cache_dir)
+        rows = make_rows(args.rows, rules, rng)
+
+        for row in rows:
+            expected = audit_application_linear(rules, row)
+            actual = auditor.audit_application(row)
+            if expected != actual:
+                print(f"❌ 判定が一致しません（ルール数 {size}）: {row['申請ID']} {expected} != {actual}")
+                return 1
+        if args.check:
+            print(f"✅ ルール数 {size}: {len(rows)}件の判定が一致")
+            continue
+
+        linear = bench(lambda row: audit_application_linear(rules, row), rows, args.repeat)
+        compiled = bench(auditor.audit_application, rows, args.repeat)
+        print(f"{size:>8}  {linear:>12.2f}  {compiled:>20.2f}  {linear / compiled:>5.1f}x")
+
+    print("\n✅ 全ルール数で従来の判定・理由・フラグと一致しました")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="審査ルール照合のベンチマーク")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 5000],
+                        help="各ルールリストの件数（デフォルト: 10 100 1000 5000）")
+    parser.add_argument("--rows", type=int, default=2000, help="審査する申請数（デフォルト: 2000）")
+    parser.add_argument("--repeat", type=int, default=3, help="計測回数（最良値を採用）")
+    parser.add_argument("--check", action="store_true",
+                        help="判定の一致だけを確認して計測しない（CI用、不一致なら終了コード1）")
+    args = parser.parse_args()
+
+    # WorkflowAuditor が作るディレクトリとルールのキャッシュを一時領域に置き、終了時に削除する
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="bench_rules_") as workdir:
+        os.chdir(workdir)
+        try:
+            return run(args, workdir)
+        finally:
+            os.chdir(cwd)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -8,96 +8,100 @@ import requests
 import xml.etree.ElementTree as ET
 from datetime import datetime, timedelta
 import sys
+import argparse
+from jvn_mirror import lookup_local
+from jvn_feed import iter_vuln_overview, probe_vuln_overview, JVNFeedError
 
 class JVNChecker:
-    def __init__(self):
-        self.api_url = "https://jvndb.jvn.jp/myjvn"
-        self.namespace = {
-            'status': 'http://jvndb.jvn.jp/myjvn/Status',
-            'item': 'http://jvndb.jvn.jp/rss/feed/',
+    def __init__(self, use_mirror=True):
+        self.use_mirror = use_mirror
+    
+    def _params(self, software_name, start_date, end_date):
+        return {
+            'keyword': software_name,
+            'rangeDatePublished': f'{start_date.strftime("%Y")}-{end_date.strftime("%Y")}',
+            'rangeDateFirstPublished': f'{start_date.strftime("%Y")}-{end_date.strftime("%Y")}',
         }
     
+    def probe(self, software_name, years=5):
+        """
+        差分審査用の軽量な指紋（件数と最新項目の日付）を取得
+        
+        ローカルミラーが新しければミラーから、なければ1件分のページのみ問い合わせる
+        
+        Returns:
+            str: 指紋（取得失敗時はNone）
+        """
+        if self.use_mirror:
+            local = lookup_local(software_name, years=years)
+            if local is not None:
+                latest = local[0]['published_date'] if local else ''
+                return f"mirror:{len(local)}:{latest}"
+        
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=365*years)
+        try:
+            total, first = probe_vuln_overview(self._params(software_name, start_date, end_date))
+        except (requests.exceptions.RequestException, JVNFeedError, ET.ParseError):
+            return None
+        latest = (first['modified'] or first['issued']) if first else ''
+        return f"myjvn:{total}:{latest}"
+    
     def check_vulnerabilities(self, software_name, years=5):
         end_date = datetime.now()
         start_date = end_date - timedelta(days=365*years)
         
-        params = {
-            'method': 'getVulnOverviewList',
-            'keyword': software_name,
-            'rangeDatePublished': f'{start_date.strftime("%Y")}-{end_date.strftime("%Y")}',
-            'rangeDateFirstPublished': f'{start_date.strftime("%Y")}-{end_date.strftime("%Y")}',
-        }
+        params = self._params(software_name, start_date, end_date)
+        
+        check_period = f'{start_date.strftime("%Y-%m-%d")} ～ {end_date.strftime("%Y-%m-%d")}'
+        
+        if self.use_mirror:
+            local = lookup_local(software_name, years=years)
+            if local is not None:
+                print(f"[INFO] ローカルミラーを検索: {software_name}")
+                return self._build_result(software_name, check_period, local, source='local_mirror')
         
         try:
             print(f"[INFO] JVNDBに問い合わせ中: {software_name}")
-            response = requests.get(self.api_url, params=params, timeout=30)
-            response.raise_for_status()
+            # 全ページを逐次解析して取得
+            vulnerabilities = [
+                {key: vuln[key] for key in ('title', 'published_date', 'link', 'description')}
+                for vuln in iter_vuln_overview(params)
+            ]
             
-            root = ET.fromstring(response.content)
-            status = self._check_status(root)
-            if not status['success']:
-                return status
-            
-            vulnerabilities = self._extract_vulnerabilities(root)
-            
-            result = {
-                'success': True,
-                'software_name': software_name,
-                'check_period': f'{start_date.strftime("%Y-%m-%d")} ～ {end_date.strftime("%Y-%m-%d")}',
-                'vulnerability_count': len(vulnerabilities),
-                'vulnerabilities': vulnerabilities,
-                'passed': len(vulnerabilities) == 0,
-            }
-            
-            return result
+            return self._build_result(software_name, check_period, vulnerabilities, source='myjvn')
             
         except requests.exceptions.RequestException as e:
+            # MyJVN障害時は古いミラーでも同期済みであれば利用する
+            local = lookup_local(software_name, years=years, allow_stale=True) if self.use_mirror else None
+            if local is not None:
+                print(f"[WARNING] API接続エラーのためローカルミラーを使用: {str(e)}")
+                return self._build_result(software_name, check_period, local, source='local_mirror')
             return {
                 'success': False,
                 'error': f'API接続エラー: {str(e)}'
             }
+        except JVNFeedError as e:
+            return {
+                'success': False,
+                'error': f'APIエラー: {str(e)}'
+            }
         except ET.ParseError as e:
             return {
                 'success': False,
                 'error': f'XML解析エラー: {str(e)}'
             }
     
-    def _check_status(self, root):
-        status_elem = root.find('.//status:statusVersion', self.namespace)
-        if status_elem is None:
-            for elem in root.iter():
-                if 'errMsg' in elem.tag:
-                    return {
-                        'success': False,
-                        'error': f'APIエラー: {elem.text}'
-                    }
-        return {'success': True}
-    
-    def _extract_vulnerabilities(self, root):
-        vulnerabilities = []
-        items = root.findall('.//item') + root.findall('.//{http://jvndb.jvn.jp/rss/feed/}item')
-        
-        for item in items:
-            vuln = {}
-            title = item.find('title')
-            if title is not None:
-                vuln['title'] = title.text
-            
-            pub_date = item.find('pubDate')
-            if pub_date is not None:
-                vuln['published_date'] = pub_date.text
-            
-            link = item.find('link')
-            if link is not None:
-                vuln['link'] = link.text
-            
-            description = item.find('description')
-            if description is not None:
-                vuln['description'] = description.text
-            
-            vulnerabilities.append(vuln)
-        
-        return vulnerabilities
+    def _build_result(self, software_name, check_period, vulnerabilities, source):
+        return {
+            'success': True,
+            'software_name': software_name,
+            'check_period': check_period,
+            'vulnerability_count': len(vulnerabilities),
+            'vulnerabilities': vulnerabilities,
+            'passed': len(vulnerabilities) == 0,
+            'source': source,
+        }
     
     def print_report(self, result):
         print("\n" + "="*70)
@@ -129,13 +133,17 @@ class JVNChecker:
 
 def main():
     if len(sys.argv) < 2:
-        print("使用方法: python3 check_jvn.py <ソフトウェア名>")
+        print("使用方法: python3 check_jvn.py <ソフトウェア名> [--live]")
         print("例: python3 check_jvn.py Apache")
         sys.exit(1)
     
-    software_name = sys.argv[1]
-    checker = JVNChecker()
-    result = checker.check_vulnerabilities(software_name)
+    parser = argparse.ArgumentParser(description="JVNDB脆弱性チェック")
+    parser.add_argument("software_name", help="ソフトウェア名")
+    parser.add_argument("--live", action="store_true", help="ローカルミラーを使わずMyJVNに問い合わせる")
+    args = parser.parse_args()
+    
+    checker = JVNChecker(use_mirror=not args.live)
+    result = checker.check_vulnerabilities(args.software_name)
     checker.print_report(result)
     sys.exit(0 if result.get('passed', False) else 1)
 
@@ -8,82 +8,145 @@ GitHub APIレート制限チェッカー
 
 import os
 import sys
+import time
 from datetime import datetime
 from github import Github, Auth
+from github_quota_ledger import QuotaLedger
 
-def check_rate_limit():
+def load_tokens():
     """
-    GitHub APIのレート制限を確認
+    環境変数からGitHub Tokenを読み込む
+    GITHUB_TOKENS（カンマ区切り）と GITHUB_TOKEN の両方に対応
     """
-    github_token = os.environ.get('GITHUB_TOKEN')
+    tokens = [t.strip() for t in os.environ.get('GITHUB_TOKENS', '').split(',') if t.strip()]
+    single = os.environ.get('GITHUB_TOKEN')
+    if single and single not in tokens:
+        tokens.insert(0, single)
+    return tokens
+
+def mask_token(github_token):
+    """表示用にTokenを伏せ字にする"""
+    return f"{github_token[:10]}...{github_token[-4:]}"
+
+def fetch_rate_limits(github_token=None):
+    """
+    GitHub APIのレート制限を取得
     
+    Returns:
+        dict: {'core'/'search'/'graphql': {'limit', 'remaining', 'reset'(epoch秒)}}
+    """
+    g = Github(auth=Auth.Token(github_token)) if github_token else Github()
+    rate_limit = g.get_rate_limit()
+    
+    # PyGithub 2.8.1では rate_limit.resources.core でアクセス
+    return {
+        name: {
+            'limit': resource.limit,
+            'remaining': resource.remaining,
+            'reset': resource.reset.timestamp(),
+        }
+        for name, resource in (
+            ('core', rate_limit.resources.core),
+            ('search', rate_limit.resources.search),
+            ('graphql', rate_limit.resources.graphql),
+        )
+    }
+
+def print_rate_limit(github_token, limits, source="API"):
+    """1つのTokenのレート制限を表示"""
     if github_token:
-        auth = Auth.Token(github_token)
-        g = Github(auth=auth)
         auth_status = "✅ 認証済み（Token使用中）"
-        token_display = f"{github_token[:10]}...{github_token[-4:]}"
     else:
-        g = Github()
         auth_status = "⚠️  未認証（匿名アクセス）"
-        token_display = "なし"
     
-    try:
-        rate_limit = g.get_rate_limit()
-        
-        # PyGithub 2.8.1では rate_limit.resources.core でアクセス
-        core = rate_limit.resources.core
-        limit = core.limit
-        remaining = core.remaining
-        reset_timestamp = core.reset.timestamp()
-        reset_time = datetime.fromtimestamp(reset_timestamp)
-        
-        # 現在時刻
-        now = datetime.now()
-        
-        # 使用率計算
-        used = limit - remaining
-        usage_percent = (used / limit) * 100 if limit > 0 else 0
-        
-        # 結果表示
-        print("=" * 70)
-        print("GitHub APIレート制限の状況")
-        print("=" * 70)
-        print(f"認証状態: {auth_status}")
-        if github_token:
-            print(f"使用中のToken: {token_display}")
-        print(f"リクエスト上限: {limit:,} 回/時")
-        print(f"残りリクエスト数: {remaining:,} 回")
-        print(f"現在時刻: {now.strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"リセット時刻: {reset_time.strftime('%Y-%m-%d %H:%M:%S')}")
+    core = limits['core']
+    limit = core['limit']
+    remaining = core['remaining']
+    reset_time = datetime.fromtimestamp(core['reset'])
+    
+    # 現在時刻
+    now = datetime.now()
+    
+    # 使用率計算
+    used = limit - remaining
+    usage_percent = (used / limit) * 100 if limit > 0 else 0
+    
+    # 結果表示
+    print("=" * 70)
+    print("GitHub APIレート制限の状況")
+    print("=" * 70)
+    print(f"認証状態: {auth_status}")
+    if github_token:
+        print(f"使用中のToken: {mask_token(github_token)}")
+    print(f"取得元: {source}")
+    print(f"リクエスト上限: {limit:,} 回/時")
+    print(f"残りリクエスト数: {remaining:,} 回")
+    print(f"現在時刻: {now.strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"リセット時刻: {reset_time.strftime('%Y-%m-%d %H:%M:%S')}")
+    print()
+    print(f"使用状況: {used}/{limit:,} ({usage_percent:.1f}%)")
+    
+    # 判定
+    if remaining > 1000:
+        print("✅ 十分なリクエスト数が残っています")
+    elif remaining > 100:
+        print("⚠️  残りリクエスト数が少なくなっています")
+    else:
+        print("❌ リクエスト数がほぼ上限に達しています")
+        print(f"   リセットまで待つか、新しいTokenを使用してください")
+    
+    print("=" * 70)
+    
+    # その他のAPIのレート制限も表示（台帳に新しい記録がないものは省略）
+    search = limits.get('search')
+    graphql = limits.get('graphql')
+    
+    if search or graphql:
         print()
-        print(f"使用状況: {used}/{limit:,} ({usage_percent:.1f}%)")
-        
-        # 判定
-        if remaining > 1000:
-            print("✅ 十分なリクエスト数が残っています")
-        elif remaining > 100:
-            print("⚠️  残りリクエスト数が少なくなっています")
-        else:
-            print("❌ リクエスト数がほぼ上限に達しています")
-            print(f"   リセットまで待つか、新しいTokenを使用してください")
-        
-        print("=" * 70)
-        
-        # その他のAPIのレート制限も表示
-        search = rate_limit.resources.search
-        graphql = rate_limit.resources.graphql
-        
-        print(f"\n[検索API] 上限: {search.limit} 回/時, 残り: {search.remaining} 回")
-        print(f"[GraphQL API] 上限: {graphql.limit} 回/時, 残り: {graphql.remaining} 回")
-        
-        return remaining > 0
-        
-    except Exception as e:
-        print(f"❌ エラー: {type(e).__name__} - {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return False
+    if search:
+        print(f"[検索API] 上限: {search['limit']} 回/時, 残り: {search['remaining']} 回")
+    if graphql:
+        print(f"[GraphQL API] 上限: {graphql['limit']} 回/時, 残り: {graphql['remaining']} 回")
+
+def check_rate_limit(refresh=False):
+    """
+    GitHub APIのレート制限を確認（GITHUB_TOKENS の複数Tokenにも対応）
+    
+    クォータ台帳に core の新しい記録があればそれを表示し（search・graphql は新しい記録が
+    あるものだけ表示）、core の記録が古い場合のみAPIに問い合わせる
+    
+    Args:
+        refresh: 台帳を使わず必ずAPIに問い合わせる
+    """
+    ledger = QuotaLedger()
+    tokens = load_tokens() or [None]
+    total_remaining = 0
+    
+    for i, github_token in enumerate(tokens):
+        if i > 0:
+            print()
+        try:
+            limits = {} if refresh else ledger.fresh(github_token)
+            if 'core' in limits:
+                age = time.time() - min(v['updated_at'] for v in limits.values())
+                source = f"クォータ台帳（{age:.0f}秒前に更新）"
+            else:
+                limits = fetch_rate_limits(github_token)
+                ledger.record(github_token, limits)
+                source = "API"
+            print_rate_limit(github_token, limits, source)
+            total_remaining += limits['core']['remaining']
+        except Exception as e:
+            print(f"❌ エラー: {type(e).__name__} - {str(e)}")
+            import traceback
+            traceback.print_exc()
+    
+    if len(tokens) > 1:
+        print(f"\n[Tokenプール] {len(tokens)}個のToken, 残りリクエスト数合計: {total_remaining:,} 回")
+    
+    return total_remaining > 0
 
 if __name__ == '__main__':
-    success = check_rate_limit()
+    refresh = '--refresh' in sys.argv[1:]
+    success = check_rate_limit(refresh=refresh)
     sys.exit(0 if success else 1)
@@ -8,49 +8,227 @@ GitHub更新頻度チェックツール
 
 import os
 import sys
+import argparse
 from datetime import datetime, timedelta, timezone
-from github import Github, Auth, GithubException
+from github import GithubException
+from github_graphql import fetch_repo_activity, parse_github_datetime
+from github_rest import GitHubRestClient
+from github_token_pool import GitHubTokenPool
+from github_quota_ledger import QuotaLedger
+from check_rate_limit import load_tokens
+
+# check_many で未取得であることを表す目印
+_NOT_FETCHED = object()
+# GraphQLでそのリポジトリだけエラーになり、RESTで取得し直すことを表す目印
+_FETCH_REST = object()
+
+# REST取得時に保存する直近12ヶ月のコミットの件数（これ以下なら日付から数え直せる）
+COMMITS_KEPT = 100
 
 class GitHubUpdateChecker:
-    def __init__(self, github_token=None):
+    def __init__(self, github_token=None, use_graphql=True):
         """
         GitHubUpdateCheckerの初期化
         
         Args:
             github_token (str): GitHub Personal Access Token
+            use_graphql (bool): GraphQL APIで一括取得する（Token必須）
         """
-        self.github_token = github_token or os.environ.get('GITHUB_TOKEN')
+        # GITHUB_TOKENS（カンマ区切り）があれば複数Tokenをプールして使う
+        tokens = load_tokens()
+        if github_token and github_token not in tokens:
+            tokens.insert(0, github_token)
+        self.ledger = QuotaLedger()
+        self.token_pool = GitHubTokenPool(tokens, ledger=self.ledger) if tokens else None
+        self.github_token = tokens[0] if tokens else None
+        self.use_graphql = use_graphql and bool(self.github_token)
+        self.rest = GitHubRestClient(self.github_token, token_pool=self.token_pool, ledger=self.ledger)
         
         if self.github_token:
-            auth = Auth.Token(self.github_token)
-            self.github = Github(auth=auth)
             print("[INFO] GitHub Token使用中（認証済み）")
+            if len(tokens) > 1:
+                print(f"[INFO] Tokenプール: {len(tokens)}個のTokenを残りクォータに応じて使い分けます")
             
-            # レート制限の確認
-            try:
-                rate_limit = self.github.get_rate_limit()
-                remaining = rate_limit.resources.core.remaining
-                print(f"[INFO] GitHub API残りリクエスト数: {remaining}")
-            except:
+            # レート制限は台帳の記録を表示（APIは呼ばない）
+            recorded = self.ledger.read(self.github_token, resources=('core',))
+            if recorded:
+                print(f"[INFO] GitHub API残りリクエスト数: {recorded['core']['remaining']}")
+            else:
                 print("[INFO] レート制限の取得をスキップしました")
         else:
-            self.github = Github()
             print("[WARNING] GitHub Tokenが設定されていません（匿名アクセス）")
             print("[WARNING] レート制限: 60回/時")
 
-    def check_github_updates(self, repo_url):
+    @staticmethod
+    def _repo_path(repo_url):
+        """URLからリポジトリ名（owner/name）を抽出"""
+        return repo_url.replace('https://github.com/', '').replace('http://github.com/', '').strip('/')
+
+    def _fetch_rest(self, repo_path, threshold_date):
+        """REST APIでリポジトリの活動状況を取得（ETagキャッシュで条件付きリクエスト）"""
+        repo, _ = self.rest.get(f"/repos/{repo_path}")
+        commit_count, recent_commits = self._commit_window(repo_path, threshold_date)
+        
+        # リリースは新しい順に取得し、基準日より古いページに達したら終了
+        releases = []
+        page = 1
+        while True:
+            items, _ = self.rest.get(f"/repos/{repo_path}/releases", {'per_page': 100, 'page': page})
+            page_releases = [
+                {'tag_name': r['tag_name'], 'created_at': parse_github_datetime(r['created_at'])}
+                for r in items
+            ]
+            releases.extend(r for r in page_releases if r['created_at'] > threshold_date)
+            if len(items) < 100 or all(r['created_at'] <= threshold_date for r in page_releases):
+                break
+            page += 1
+        
+        return {
+            'description': repo.get('description'),
+            'stars': repo.get('stargazers_count', 0),
+            'forks': repo.get('forks_count', 0),
+            'watchers': repo.get('watchers_count', 0),
+            'created_at': parse_github_datetime(repo.get('created_at')),
+            'updated_at': parse_github_datetime(repo.get('updated_at')),
+            'language': repo.get('language'),
+            'commit_count': commit_count,
+            'recent_commits': recent_commits,
+            'releases': releases,
+        }
+
+    def _commit_window(self, repo_path, threshold_date):
+        """
+        基準日以降のコミット数と最新5件
+
+        since を含むURLは基準日とともに毎回変わり304にならないため、まず since なしの
+        最新1件（毎回同じURLなのでETagが効く）でSHAを確認する。前回とSHAが同じなら
+        新しいコミットはないので、保存しておいたコミットの日時から基準日以降を数え直す
+        （基準日以降のコミットが保存件数を超えていた場合は毎回問い合わせる）
+
+        Returns:
+            (コミット数, [{'sha', 'date', 'message'}])
+        """
+        latest, _ = self.rest.get(f"/repos/{repo_path}/commits", {'per_page': 1})
+        latest_sha = latest[0]['sha'] if latest else ''
+        
+        key = f"commit_window:{repo_path}"
+        saved = self.rest.load_value(key)
+        if saved and saved['sha'] == latest_sha and saved['count'] <= len(saved['commits']) \
+                and threshold_date >= parse_github_datetime(saved['since']):
+            # 前回の時点の全件を保存してあるので、基準日が進んでも日時から数え直せる
+            kept = [c for c in saved['commits'] if parse_github_datetime(c['committed']) >= threshold_date]
+            return len(kept), self._recent(kept)
+        
+        since = threshold_date.strftime('%Y-%m-%dT%H:%M:%SZ')
+        commits = []
+        if latest_sha:
+            commits, _ = self.rest.get(f"/repos/{repo_path}/commits", {'since': since, 'per_page': COMMITS_KEPT})
+        commit_count = len(commits)
+        if commit_count >= COMMITS_KEPT:
+            # 件数は per_page=1 の最終ページ番号から求める
+            first_page, link = self.rest.get(f"/repos/{repo_path}/commits", {'since': since, 'per_page': 1})
+            commit_count = self.rest.last_page(link) or len(first_page)
+        
+        kept = [
+            {
+                'sha': commit['sha'],
+                'date': commit['commit']['author']['date'],
+                'committed': commit['commit']['committer']['date'],
+                'message': commit['commit']['message'],
+            }
+            for commit in commits
+        ]
+        self.rest.save_value(key, {'sha': latest_sha, 'since': since, 'count': commit_count, 'commits': kept})
+        return commit_count, self._recent(kept)
+
+    @staticmethod
+    def _recent(commits):
+        return [
+            {'sha': c['sha'], 'date': parse_github_datetime(c['date']), 'message': c['message']}
+            for c in commits[:5]
+        ]
+
+    def probe(self, repo_url):
+        """
+        差分審査用の軽量な指紋（最新コミットSHAと最新リリースタグ）を取得
+        
+        ETag付きの条件付きリクエストなので、変化がなければ304でクォータを消費しない
+        
+        Returns:
+            dict: {'commit_sha', 'release_tag'}（取得失敗時はNone）
+        """
+        repo_path = self._repo_path(repo_url)
+        try:
+            commits, _ = self.rest.get(f"/repos/{repo_path}/commits", {'per_page': 1})
+            releases, _ = self.rest.get(f"/repos/{repo_path}/releases", {'per_page': 1})
+        except Exception:
+            return None
+        return {
+            'commit_sha': commits[0]['sha'] if commits else '',
+            'release_tag': releases[0]['tag_name'] if releases else '',
+        }
+
+    def print_cache_summary(self):
+        """REST応答キャッシュの利用状況を表示"""
+        stats = self.rest.summary()
+        if not stats['requests']:
+            return
+        print(f"\n[INFO] GitHub RESTキャッシュ: リクエスト {stats['requests']}件 / "
+              f"304応答 {stats['not_modified']}件 / 節約したクォータ {stats['quota_saved']}回")
+
+    def _fetch_graphql(self, repo_paths, threshold_date):
+        """
+        GraphQL APIで複数リポジトリの活動状況をまとめて取得
+        
+        Returns:
+            dict: {'owner/name': 活動状況 または None}（エラーになったリポジトリは含まない）。失敗時は None
+        """
+        if not self.use_graphql:
+            return None
+        try:
+            return fetch_repo_activity(repo_paths, self.github_token, threshold_date, token_pool=self.token_pool)
+        except Exception as e:
+            print(f"[WARNING] GraphQL取得に失敗したためREST APIで取得します: {type(e).__name__} - {str(e)}")
+            return None
+
+    def prefetch(self, repo_urls):
+        """
+        複数リポジトリの活動状況をGraphQLで一括取得
+        
+        Returns:
+            dict: {repo_url: check_github_updates に渡す prefetched 値}
+        """
+        threshold_date = datetime.now(timezone.utc) - timedelta(days=365)
+        paths = [self._repo_path(url) for url in repo_urls]
+        fetched = self._fetch_graphql(paths, threshold_date)
+        if fetched is None:
+            return {url: _NOT_FETCHED for url in repo_urls}
+        return {url: fetched.get(path, _FETCH_REST) for url, path in zip(repo_urls, paths)}
+
+    def check_many(self, repo_urls):
+        """
+        複数リポジトリをGraphQLで一括取得してからチェック
+        
+        Returns:
+            dict: {repo_url: チェック結果 または None}
+        """
+        prefetched = self.prefetch(repo_urls)
+        return {url: self.check_github_updates(url, prefetched=prefetched[url]) for url in repo_urls}
+
+    def check_github_updates(self, repo_url, prefetched=_NOT_FETCHED):
         """
         GitHubリポジトリの更新頻度をチェック
         
         Args:
             repo_url (str): GitHubリポジトリのURL
+            prefetched: check_many で取得済みの活動状況（Noneはリポジトリ未検出）
             
         Returns:
             dict: チェック結果
         """
         try:
             # URLからリポジトリ名を抽出
-            repo_path = repo_url.replace('https://github.com/', '').replace('http://github.com/', '').strip('/')
+            repo_path = self._repo_path(repo_url)
             
             print(f"\n{'='*70}")
             print("更新頻度チェック結果")
@@ -58,33 +236,37 @@ class GitHubUpdateChecker:
             print(f"対象リポジトリ: {repo_path}")
             print(f"URL: {repo_url}")
             
-            # リポジトリ情報を取得
-            repo = self.github.get_repo(repo_path)
-            
             # タイムゾーン付きの現在日時（UTC）
             now = datetime.now(timezone.utc)
             threshold_date = now - timedelta(days=365)  # 12ヶ月前
             
+            # リポジトリ情報を取得（GraphQLは1クエリ、失敗時はREST）
+            activity = prefetched
+            if activity is _NOT_FETCHED:
+                fetched = self._fetch_graphql([repo_path], threshold_date) or {}
+                activity = fetched.get(repo_path, _FETCH_REST)
+            if activity is _FETCH_REST:
+                activity = self._fetch_rest(repo_path, threshold_date)
+            if activity is None:
+                raise GithubException(404, {'message': 'Not Found'})
+            
             print(f"確認期間: 直近12ヶ月")
             print(f"基準日: {threshold_date.strftime('%Y-%m-%d')}")
             
             # リポジトリの基本情報
-            print(f"最終更新日: {repo.updated_at}")
+            print(f"最終更新日: {activity['updated_at']}")
             
-            # 最新のコミット情報を取得
-            commits = repo.get_commits(since=threshold_date)
-            commit_count = commits.totalCount
-            
-            print(f"最終コミット日: {commits[0].commit.author.date if commit_count > 0 else 'N/A'}")
-            print(f"コミット数（12ヶ月）: {commit_count}件")
+            commit_count = activity['commit_count']
+            recent_commits = activity['recent_commits']
             
             # コミット日の取得
-            latest_commit = commits[0] if commit_count > 0 else None
-            latest_commit_date = latest_commit.commit.author.date if latest_commit else None
+            latest_commit_date = recent_commits[0]['date'] if commit_count > 0 and recent_commits else None
+            
+            print(f"最終コミット日: {latest_commit_date if commit_count > 0 else 'N/A'}")
+            print(f"コミット数（12ヶ月）: {commit_count}件")
             
-            # リリース情報を取得
-            releases = repo.get_releases()
-            recent_releases = [r for r in releases if r.created_at > threshold_date]
+            # リリース情報
+            recent_releases = [r for r in activity['releases'] if r['created_at'] > threshold_date]
             release_count = len(recent_releases)
             
             print(f"リリース数（12ヶ月）: {release_count}件")
@@ -123,26 +305,26 @@ class GitHubUpdateChecker:
             
             # 詳細情報
             print(f"\n【リポジトリ情報】")
-            print(f"説明: {repo.description or 'N/A'}")
-            print(f"スター数: {repo.stargazers_count}")
-            print(f"フォーク数: {repo.forks_count}")
-            print(f"ウォッチャー数: {repo.watchers_count}")
-            print(f"作成日: {repo.created_at.strftime('%Y-%m-%d')}")
-            print(f"主要言語: {repo.language or 'N/A'}")
+            print(f"説明: {activity['description'] or 'N/A'}")
+            print(f"スター数: {activity['stars']}")
+            print(f"フォーク数: {activity['forks']}")
+            print(f"ウォッチャー数: {activity['watchers']}")
+            print(f"作成日: {activity['created_at'].strftime('%Y-%m-%d')}")
+            print(f"主要言語: {activity['language'] or 'N/A'}")
             
             # 最近のコミット（最新5件）
             print(f"\n【最近のコミット】（最新5件）")
-            for i, commit in enumerate(commits[:5], 1):
-                commit_date = commit.commit.author.date.strftime('%Y-%m-%d %H:%M:%S')
-                commit_msg = commit.commit.message.split('\n')[0][:60]
+            for i, commit in enumerate(recent_commits[:5], 1):
+                commit_date = commit['date'].strftime('%Y-%m-%d %H:%M:%S')
+                commit_msg = commit['message'].split('\n')[0][:60]
                 print(f"{i}. {commit_date} - {commit_msg}")
             
             # 最近のリリース（最新3件）
             if release_count > 0:
                 print(f"\n【最近のリリース】（最新3件）")
                 for i, release in enumerate(recent_releases[:3], 1):
-                    release_date = release.created_at.strftime('%Y-%m-%d')
-                    print(f"{i}. {release.tag_name} ({release_date})")
+                    release_date = release['created_at'].strftime('%Y-%m-%d')
+                    print(f"{i}. {release['tag_name']} ({release_date})")
             
             print('='*70)
             
@@ -167,23 +349,60 @@ class GitHubUpdateChecker:
             traceback.print_exc()
             return None
 
+def read_software_list(list_path):
+    """software_list.txt（name,repo_url形式）から (ソフトウェア名, GitHub URL) のリストを読み込む"""
+    entries = []
+    with open(list_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#') or line.startswith('name,'):
+                continue
+            parts = line.split(',', 1)
+            name = parts[0].strip()
+            url = parts[1].strip() if len(parts) == 2 else ''
+            if name:
+                entries.append((name, url))
+    return entries
+
+def read_repo_urls(list_path):
+    """software_list.txt からGitHub URLのみを読み込む"""
+    return [url for _, url in read_software_list(list_path) if url]
+
 def main():
     """メイン処理"""
     if len(sys.argv) < 2:
-        print("使用方法: python check_updates.py <GitHubリポジトリURL>")
+        print("使用方法: python check_updates.py <GitHubリポジトリURL> [URL ...]")
+        print("          python check_updates.py --list software_list.txt")
         print("例: python check_updates.py https://github.com/apache/httpd")
         sys.exit(1)
     
-    repo_url = sys.argv[1]
+    parser = argparse.ArgumentParser(description="GitHub更新頻度チェック")
+    parser.add_argument("repo_urls", nargs="*", help="GitHubリポジトリURL")
+    parser.add_argument("--list", dest="list_path", help="software_list.txt 形式のファイルから一括チェック")
+    parser.add_argument("--rest", action="store_true", help="GraphQLを使わずREST APIで取得")
+    args = parser.parse_args()
+    
+    repo_urls = list(args.repo_urls)
+    if args.list_path:
+        repo_urls.extend(read_repo_urls(args.list_path))
+    if not repo_urls:
+        parser.error("GitHubリポジトリURLを指定してください")
+    
     github_token = os.environ.get('GITHUB_TOKEN')
     
-    checker = GitHubUpdateChecker(github_token)
-    result = checker.check_github_updates(repo_url)
+    checker = GitHubUpdateChecker(github_token, use_graphql=not args.rest)
+    
+    if len(repo_urls) == 1:
+        results = {repo_urls[0]: checker.check_github_updates(repo_urls[0])}
+    else:
+        results = checker.check_many(repo_urls)
+    
+    checker.print_cache_summary()
     
-    if result is None:
+    if any(result is None for result in results.values()):
         sys.exit(1)
     
-    sys.exit(0 if result['is_active'] else 1)
+    sys.exit(0 if all(result['is_active'] for result in results.values()) else 1)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ワークフロー申請の判定キャッシュ
+判定に影響する項目（ソフトウェア名・ベンダー・ライセンス形態・コスト・部署・
+利用目的・備考）とルールのバージョンの組で判定結果を記録し、同じ内容の申請を
+ファイル・実行をまたいで再審査せずに判定します
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from rule_engine import CompiledRules, parse_cost
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "decision_cache.sqlite3")
+DEFAULT_MAX_ENTRIES = int(os.environ.get('WORKFLOW_DECISION_CACHE_MAX_ENTRIES', '200000'))
+DEFAULT_MAX_AGE_DAYS = float(os.environ.get('WORKFLOW_DECISION_CACHE_MAX_AGE_DAYS', '30'))
+
+class DecisionCache:
+    """メモリ上の辞書とSQLiteファイルを組み合わせた判定キャッシュ"""
+
+    def __init__(self, path: str = None, max_entries: int = None, max_age_days: float = None):
+        """
+        Args:
+            path: SQLiteファイルのパス
+            max_entries: 保持する最大件数（メモリでは超えた分は記録せず、ファイルでは古い順に削除）
+            max_age_days: ファイルに残す日数（超えた記録は保存時に削除）
+        """
+        self.path = path or DEFAULT_CACHE_PATH
+        self.max_entries = DEFAULT_MAX_ENTRIES if max_entries is None else max_entries
+        self.max_age_days = DEFAULT_MAX_AGE_DAYS if max_age_days is None else max_age_days
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._pending = []  # まだファイルに書いていない新しい判定
+        self._loaded_versions = set()
+        self._costs = {}
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._connect() as conn:
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(decisions)")]
+            if columns and 'created_at' not in columns:
+                conn.execute("DROP TABLE decisions")  # 作成日時のない旧形式（キャッシュなので作り直す）
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS decisions (
+                    version TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    decision TEXT NOT NULL,
+                    reason TEXT NOT NULL,
+                    flags TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (version, key)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_decisions_created ON decisions (created_at)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _load(self, version: str):
+        """
+        指定バージョンの記録をまとめてメモリに読み込む
+
+        別のルールで動いているプロセス（並列ワーカー・常駐監視・再読み込み前後）の記録も
+        使われうるため、ほかのバージョンの記録はここでは消さず、保存時に日数と件数で整理する
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT key, decision, reason, flags FROM decisions WHERE version = ? LIMIT ?",
+                (version, self.max_entries)
+            ).fetchall()
+        with self._lock:
+            for key, decision, reason, flags in rows:
+                self._entries[(version,) + tuple(json.loads(key))] = (decision, reason, tuple(json.loads(flags)))
+            self._loaded_versions.add(version)
+
+    def make_key(self, app: Dict, rules: CompiledRules) -> Tuple:
+        """判定に影響する項目とルールのバージョンからキーを作る（コストは解析後の値）"""
+        cost_str = app.get('コスト', '0円')
+        cost = self._costs.get(cost_str)
+        if cost is None:
+            cost = parse_cost(cost_str)
+            if len(self._costs) < self.max_entries:
+                self._costs[cost_str] = cost
+        return (
+            rules.version,
+            app.get('ソフトウェア名', ''),
+            app.get('ベンダー', ''),
+            app.get('ライセンス形態', ''),
+            cost[0], cost[1],
+            app.get('部署', ''),
+            app.get('利用目的', ''),
+            app.get('備考', ''),
+        )
+
+    def get(self, key: Tuple) -> Optional[Tuple[str, str, List[str]]]:
+        """記録があれば (判定, 理由, フラグリスト) を返す"""
+        if key[0] not in self._loaded_versions:
+            self._load(key[0])
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        decision, reason, flags = entry
+        return decision, reason, list(flags)
+
+    def put(self, key: Tuple, result: Tuple[str, str, List[str]]):
+        decision, reason, flags = result
+        with self._lock:
+            if len(self._entries) >= self.max_entries or key in self._entries:
+                return
+            self._entries[key] = (decision, reason, tuple(flags))
+            self._pending.append(key)
+
+    def flush(self):
+        """新しい判定をファイルに書き込む（他のプロセスと共有し、次回以降の実行でも使う）"""
+        now = time.time()
+        with self._lock:
+            pending, self._pending = self._pending, []
+            rows = [
+                (key[0], json.dumps(list(key[1:]), ensure_ascii=False), *self._entries[key][:2],
+                 json.dumps(list(self._entries[key][2]), ensure_ascii=False), now)
+                for key in pending
+            ]
+        if rows:
+            with self._connect() as conn:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO decisions (version, key, decision, reason, flags, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                self._prune(conn, now)
+
+    def _prune(self, conn, now: float):
+        """日数を過ぎた記録と、件数の上限を超えた古い記録を削除"""
+        conn.execute("DELETE FROM decisions WHERE created_at < ?", (now - self.max_age_days * 86400,))
+        conn.execute(
+            "DELETE FROM decisions WHERE rowid IN ("
+            "  SELECT rowid FROM decisions ORDER BY created_at DESC LIMIT -1 OFFSET ?"
+            ")",
+            (self.max_entries,)
+        )
+
+    def take_stats(self) -> Tuple[int, int]:
+        """前回の呼び出し以降の (ヒット数, ミス数) を返してリセット"""
+        stats = (self.hits, self.misses)
+        self.hits = self.misses = 0
+        return stats
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ディレクトリスナップショット
+os.scandir で1回だけ走査したファイル一覧（件数・合計サイズ・更新日時順）をキャッシュし、
+inotify で変更が通知されたディレクトリか、更新時刻が変わったディレクトリだけを再走査します
+"""
+
+import os
+import sys
+import errno
+import ctypes
+import ctypes.util
+import select
+import struct
+import threading
+from collections import namedtuple
+from pathlib import Path
+
+FileEntry = namedtuple('FileEntry', ['path', 'name', 'mtime', 'size', 'is_file'])
+
+# ============================================
+# inotify
+# ============================================
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, len
+
+# 審査待ちファイルの到着（pending_watcher.py）
+PENDING_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+# スナップショットの件数・サイズ・更新時刻に影響する変更（上書き・削除・移動を含む）
+SNAPSHOT_MASK = PENDING_MASK | IN_ATTRIB | IN_MOVED_FROM | IN_DELETE
+
+class InotifyWatcher:
+    """inotify で変更のあったファイルを受け取る（Linuxのみ、ctypes で libc を直接呼ぶ）"""
+
+    mode = 'inotify'
+
+    def __init__(self, directories=(), mask=PENDING_MASK):
+        """
+        Args:
+            directories: 監視するディレクトリのリスト（あとから add() でも追加できる）
+            mask: 受け取るイベントの種類
+
+        Raises:
+            OSError: inotify が使えない場合
+        """
+        libc_name = ctypes.util.find_library('c')
+        if sys.platform != 'linux' or not libc_name:
+            raise OSError(errno.ENOSYS, "inotify はこの環境では使えません")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 に失敗しました")
+        self._mask = mask
+        self._dirs = {}
+        try:
+            for directory in directories:
+                self.add(directory)
+        except OSError:
+            os.close(self._fd)
+            raise
+
+    def add(self, directory):
+        """
+        ディレクトリを監視対象に加える（監視中なら何もしない）
+
+        Raises:
+            OSError: inotify_add_watch に失敗した場合（存在しないディレクトリなど）
+        """
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(str(directory)), self._mask)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch に失敗しました: {directory}")
+        self._dirs[wd] = Path(directory)
+
+    def wait(self, timeout):
+        """
+        変更を待つ（timeout=0 なら届いている通知だけを読んで戻る）
+
+        Returns:
+            変更のあったファイルのパスの集合（イベントが溢れた場合は None = 全体を再走査）
+        """
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed = set()
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return changed
+            pos = 0
+            while pos < len(data):
+                wd, mask, _cookie, length = EVENT_HEADER.unpack_from(data, pos)
+                pos += EVENT_HEADER.size
+                name = data[pos:pos + length].rstrip(b'\0')
+                pos += length
+                if mask & IN_Q_OVERFLOW:
+                    return None
+                if wd in self._dirs and name:
+                    changed.add(self._dirs[wd] / os.fsdecode(name))
+
+    def close(self):
+        os.close(self._fd)
+
+# ============================================
+# スナップショット
+# ============================================
+class DirectorySnapshot:
+    """1ディレクトリ分の走査結果"""
+
+    def __init__(self, directory, dir_mtime_ns, entries):
+        """
+        Args:
+            directory: 対象ディレクトリ（Path）
+            dir_mtime_ns: 走査時点のディレクトリの更新時刻
+            entries: FileEntry のリスト（更新日時の新しい順）
+        """
+        self.directory = directory
+        self.dir_mtime_ns = dir_mtime_ns
+        self.entries = entries
+        self.count = len(entries)
+        self.total_size = sum(e.size for e in entries if e.is_file)
+
+    def recent(self, limit=5):
+        """更新日時の新しい順に limit 件"""
+        return self.entries[:limit]
+
+
+def scan_directory(directory):
+    """
+    ディレクトリを1回走査してスナップショットを作る（glob("*") と同じく隠しファイルは除外）
+
+    Returns:
+        DirectorySnapshot: 存在しないディレクトリは空のスナップショット
+    """
+    directory = Path(directory)
+    try:
+        dir_mtime_ns = directory.stat().st_mtime_ns
+        iterator = os.scandir(directory)
+    except OSError:
+        return DirectorySnapshot(directory, None, [])
+
+    entries = []
+    with iterator:
+        for entry in iterator:
+            if entry.name.startswith('.'):
+                continue
+            try:
+                st = entry.stat()
+                is_file = entry.is_file()
+            except OSError:
+                continue  # 走査中に削除されたファイル
+            entries.append(FileEntry(Path(entry.path), entry.name, st.st_mtime, st.st_size, is_file))
+
+    entries.sort(key=lambda e: e.mtime, reverse=True)
+    return DirectorySnapshot(directory, dir_mtime_ns, entries)
+
+
+class SnapshotCache:
+    """ディレクトリごとのスナップショットを inotify の通知と更新時刻で無効化するキャッシュ"""
+
+    def __init__(self, use_inotify=True):
+        """
+        Args:
+            use_inotify: inotify で変更を受け取る（使えない環境ではディレクトリの更新時刻だけで判断）
+        """
+        self._lock = threading.Lock()
+        self._snapshots = {}
+        self.scans = 0
+        self._watcher = None
+        if use_inotify:
+            try:
+                self._watcher = InotifyWatcher(mask=SNAPSHOT_MASK)
+            except OSError:
+                pass
+
+    @property
+    def mode(self):
+        return 'inotify' if self._watcher else 'mtime'
+
+    def get(self, directory):
+        """
+        スナップショットを取得（変更が通知されたか、ディレクトリの更新時刻が変わっていれば再走査）
+
+        ファイルの追加・削除・名前変更はディレクトリの更新時刻に反映されるが、既存ファイルの
+        上書きは反映されないため、上書きは inotify の通知で検知する（別プロセスのシェル
+        スクリプトが書いたレポートも対象）。inotify が使えない環境では上書きは invalidate() を
+        呼ぶまで反映されない
+        """
+        directory = Path(directory)
+        self._apply_notifications()
+        try:
+            dir_mtime_ns = directory.stat().st_mtime_ns
+        except OSError:
+            dir_mtime_ns = None
+
+        with self._lock:
+            cached = self._snapshots.get(directory)
+        if cached is not None and cached.dir_mtime_ns == dir_mtime_ns:
+            return cached
+
+        # 走査中の変更を取りこぼさないよう、監視を始めてから走査する
+        if self._watcher is not None and dir_mtime_ns is not None:
+            with self._lock:
+                try:
+                    self._watcher.add(directory)
+                except OSError:
+                    pass
+        snapshot = scan_directory(directory)
+        with self._lock:
+            self._snapshots[directory] = snapshot
+            self.scans += 1
+        return snapshot
+
+    def _apply_notifications(self):
+        """届いている inotify の通知を読み、変更のあったディレクトリのスナップショットを破棄"""
+        if self._watcher is None:
+            return
+        changed = self._watcher.wait(0)
+        if changed is None:
+            self.invalidate()
+            return
+        if changed:
+            with self._lock:
+                for path in changed:
+                    self._snapshots.pop(path.parent, None)
+
+    def invalidate(self, directory=None):
+        """指定ディレクトリ（Noneなら全て）のスナップショットを破棄"""
+        with self._lock:
+            if directory is None:
+                self._snapshots.clear()
+            else:
+                self._snapshots.pop(Path(directory), None)
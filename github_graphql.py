@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+GitHub GraphQL APIによるリポジトリ活動状況の一括取得
+12ヶ月のコミット数・最新コミット・リリース・スター数などを1クエリで取得し、
+複数リポジトリはエイリアスで1リクエストにまとめます
+"""
+
+import json
+from datetime import datetime
+
+import http_client
+
+GRAPHQL_URL = "https://api.github.com/graphql"
+BATCH_SIZE = 20  # 1リクエストにまとめるリポジトリ数
+RELEASES_FETCHED = 100
+
+REPO_FIELDS = """
+    description
+    stargazerCount
+    forkCount
+    createdAt
+    updatedAt
+    primaryLanguage { name }
+    defaultBranchRef {
+      target {
+        ... on Commit {
+          period: history(since: $since) { totalCount }
+          recent: history(first: 5, since: $since) {
+            nodes { oid authoredDate message }
+          }
+        }
+      }
+    }
+    releases(first: %d, orderBy: {field: CREATED_AT, direction: DESC}) {
+      nodes { tagName createdAt }
+      pageInfo { hasNextPage endCursor }
+    }
+""" % RELEASES_FETCHED
+
+# 基準日より新しいリリースが1ページに収まらなかったリポジトリの続きのページ
+RELEASES_PAGE_FIELDS = """
+    releases(first: %d, after: %%s, orderBy: {field: CREATED_AT, direction: DESC}) {
+      nodes { tagName createdAt }
+      pageInfo { hasNextPage endCursor }
+    }
+""" % RELEASES_FETCHED
+
+class GitHubGraphQLError(Exception):
+    """GraphQL APIがエラーを返した"""
+
+
+def parse_github_datetime(value):
+    """'2026-02-12T03:43:27Z' をタイムゾーン付きdatetimeに変換"""
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def _build_query(repo_paths):
+    parts = []
+    for i, path in enumerate(repo_paths):
+        owner, name = path.split('/', 1)
+        parts.append(f'  r{i}: repository(owner: {json.dumps(owner)}, name: {json.dumps(name)}) {{{REPO_FIELDS}  }}')
+    body = "\n".join(parts)
+    return f"query($since: GitTimestamp!) {{\n{body}\n  rateLimit {{ cost remaining resetAt }}\n}}"
+
+
+def _build_releases_query(cursors):
+    """{'owner/name': endCursor} の続きのリリースを取得するクエリ"""
+    parts = []
+    for i, (path, cursor) in enumerate(cursors.items()):
+        owner, name = path.split('/', 1)
+        fields = RELEASES_PAGE_FIELDS % json.dumps(cursor)
+        parts.append(f'  r{i}: repository(owner: {json.dumps(owner)}, name: {json.dumps(name)}) {{{fields}  }}')
+    body = "\n".join(parts)
+    return f"query {{\n{body}\n}}"
+
+
+def _to_activity(repo):
+    """GraphQLのrepositoryノードを活動状況dictに変換"""
+    target = (repo.get('defaultBranchRef') or {}).get('target') or {}
+    recent = ((target.get('recent') or {}).get('nodes')) or []
+    commits = [
+        {
+            'sha': node['oid'],
+            'date': parse_github_datetime(node['authoredDate']),
+            'message': node.get('message', ''),
+        }
+        for node in recent
+    ]
+    return {
+        'description': repo.get('description'),
+        'stars': repo.get('stargazerCount', 0),
+        'forks': repo.get('forkCount', 0),
+        'watchers': repo.get('stargazerCount', 0),  # REST の watchers_count はスター数と同値
+        'created_at': parse_github_datetime(repo.get('createdAt')),
+        'updated_at': parse_github_datetime(repo.get('updatedAt')),
+        'language': (repo.get('primaryLanguage') or {}).get('name'),
+        'commit_count': ((target.get('period') or {}).get('totalCount')) or 0,
+        'recent_commits': commits,
+        'releases': _to_releases(repo),
+    }
+
+
+def _to_releases(repo):
+    return [
+        {'tag_name': node['tagName'], 'created_at': parse_github_datetime(node['createdAt'])}
+        for node in (repo.get('releases') or {}).get('nodes') or []
+    ]
+
+
+def _next_releases_cursor(repo, releases, since):
+    """基準日より新しいリリースがまだ続く場合は次のページのカーソル（なければNone）"""
+    page_info = (repo.get('releases') or {}).get('pageInfo') or {}
+    if not page_info.get('hasNextPage') or not releases or releases[-1]['created_at'] <= since:
+        return None
+    return page_info.get('endCursor')
+
+
+def _post_query(post, query, variables, token, token_pool):
+    """
+    クエリを送信（Tokenプール指定時は枯渇したTokenを外して再試行）
+
+    Returns:
+        dict: 応答のJSON
+
+    Raises:
+        GitHubGraphQLError: HTTPエラー
+    """
+    attempts = max(len(token_pool), 1) + 1 if token_pool else 1
+    for _ in range(attempts):
+        batch_token = token_pool.acquire('graphql') if token_pool else token
+        response = post(
+            GRAPHQL_URL,
+            json={'query': query, 'variables': variables},
+            headers={'Authorization': f'bearer {batch_token}'},
+            timeout=30,
+        )
+        if not token_pool:
+            break
+        token_pool.update_from_headers(batch_token, response.headers)
+        rate_limited = response.status_code == 429 or (
+            response.status_code == 403 and response.headers.get('X-RateLimit-Remaining') == '0'
+        )
+        if not rate_limited:
+            break
+        # 枯渇したTokenを外して別のTokenで再試行
+        reset = response.headers.get('X-RateLimit-Reset')
+        token_pool.mark_exhausted(batch_token, 'graphql', float(reset) if reset else None)
+    if response.status_code != 200:
+        raise GitHubGraphQLError(f"HTTP {response.status_code}: {response.text[:200]}")
+    return response.json()
+
+
+def _split_errors(payload, aliases):
+    """
+    エラーをエイリアスごとに振り分ける
+
+    Returns:
+        (見つからなかったエイリアス, それ以外のエラーがあったエイリアス)
+
+    Raises:
+        GitHubGraphQLError: どのエイリアスにも属さないエラー、またはデータがない場合
+    """
+    data = payload.get('data') or {}
+    not_found, failed = set(), set()
+    for error in payload.get('errors') or []:
+        path = error.get('path') or []
+        alias = path[0] if path and path[0] in aliases else None
+        if alias is None:
+            raise GitHubGraphQLError(error.get('message', str(error)))
+        (not_found if error.get('type') == 'NOT_FOUND' else failed).add(alias)
+    if payload.get('errors') and not data:
+        raise GitHubGraphQLError(payload['errors'][0].get('message', str(payload['errors'][0])))
+    return not_found, failed - not_found
+
+
+def fetch_repo_activity(repo_paths, token, since, batch_size=BATCH_SIZE, post=None, token_pool=None):
+    """
+    複数リポジトリの活動状況をまとめて取得
+
+    リリースは基準日より古いものに達するまでページをたどる（REST APIと同じ件数にする）
+
+    Args:
+        repo_paths: 'owner/name' のリスト
+        token: GitHub Personal Access Token（GraphQLは認証必須）
+        since: コミット数・リリース数を数える起点（タイムゾーン付きdatetime）
+        post: HTTP POST関数（既定は共有HTTPクライアント）
+        token_pool: GitHubTokenPool（指定時はバッチごとにgraphql残りが最も多いTokenを使う）
+
+    Returns:
+        dict: {'owner/name': 活動状況dict または None（見つからない場合）}。
+              見つからない以外のエラーになったリポジトリは含めない（呼び出し側でRESTに切り替える）
+
+    Raises:
+        GitHubGraphQLError: 認証エラーなどクエリ全体が失敗した場合
+    """
+    post = post or http_client.post
+    since_str = since.strftime('%Y-%m-%dT%H:%M:%SZ')
+    activity = {}
+    cursors = {}
+
+    for offset in range(0, len(repo_paths), batch_size):
+        batch = repo_paths[offset:offset + batch_size]
+        payload = _post_query(post, _build_query(batch), {'since': since_str}, token, token_pool)
+        data = payload.get('data') or {}
+        not_found, failed = _split_errors(payload, {f'r{i}' for i in range(len(batch))})
+
+        for i, path in enumerate(batch):
+            alias = f'r{i}'
+            repo = data.get(alias)
+            if alias in failed or (repo is None and alias not in not_found):
+                continue
+            activity[path] = _to_activity(repo) if repo else None
+            if repo:
+                cursor = _next_releases_cursor(repo, activity[path]['releases'], since)
+                if cursor:
+                    cursors[path] = cursor
+
+    # 続きのリリースは、まだ続くリポジトリだけをまとめて取得
+    while cursors:
+        batch = dict(list(cursors.items())[:batch_size])
+        payload = _post_query(post, _build_releases_query(batch), {}, token, token_pool)
+        data = payload.get('data') or {}
+        not_found, failed = _split_errors(payload, {f'r{i}' for i in range(len(batch))})
+        for i, path in enumerate(batch):
+            del cursors[path]
+            repo = data.get(f'r{i}')
+            if f'r{i}' in failed or f'r{i}' in not_found or not repo:
+                activity.pop(path, None)  # 件数が確定しないためRESTで取り直す
+                continue
+            releases = _to_releases(repo)
+            activity[path]['releases'].extend(releases)
+            cursor = _next_releases_cursor(repo, releases, since)
+            if cursor:
+                cursors[path] = cursor
+
+    return activity
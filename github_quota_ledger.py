@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+GitHub APIクォータ台帳
+通常の応答の X-RateLimit-* ヘッダーからTokenごとの残り回数を記録し、
+複数プロセス間でファイルロック付きで共有します（Token自体は保存しません）
+"""
+
+import os
+import json
+import time
+import fcntl
+import hashlib
+import tempfile
+from contextlib import contextmanager
+
+DEFAULT_LEDGER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "github_quota_ledger.json")
+DEFAULT_MAX_AGE = int(os.environ.get('GITHUB_QUOTA_LEDGER_MAX_AGE', '300'))  # 秒
+
+RESOURCES = ('core', 'search', 'graphql')
+
+def token_key(github_token):
+    """台帳のキー（Tokenのハッシュ。匿名は 'anonymous'）"""
+    if not github_token:
+        return 'anonymous'
+    return hashlib.sha256(github_token.encode('utf-8')).hexdigest()[:16]
+
+class QuotaLedger:
+    """ファイルロックで保護されたクォータ台帳"""
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path: 台帳JSONファイルのパス
+        """
+        self.path = path or DEFAULT_LEDGER_PATH
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+    @contextmanager
+    def _locked(self, exclusive):
+        with open(self.path + '.lock', 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save(self, data):
+        # 一時ファイルに書いてから置き換え、読み手に書きかけの状態を見せない
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def record(self, github_token, limits):
+        """
+        レート制限を記録
+
+        Args:
+            limits: {'core'/'search'/'graphql': {'limit', 'remaining', 'reset'}}（一部のみでも可）
+        """
+        now = time.time()
+        with self._locked(exclusive=True):
+            data = self._load()
+            entry = data.setdefault(token_key(github_token), {})
+            for resource, values in limits.items():
+                entry[resource] = dict(values, updated_at=now)
+            self._save(data)
+
+    def record_headers(self, github_token, headers):
+        """応答の X-RateLimit-* ヘッダーを記録（ヘッダーがなければ何もしない）"""
+        if 'X-RateLimit-Remaining' not in headers:
+            return
+        resource = headers.get('X-RateLimit-Resource', 'core')
+        if resource not in RESOURCES:
+            return
+        self.record(github_token, {resource: {
+            'limit': int(headers.get('X-RateLimit-Limit', 0)),
+            'remaining': int(headers['X-RateLimit-Remaining']),
+            'reset': float(headers.get('X-RateLimit-Reset', 0)),
+        }})
+
+    def fresh(self, github_token, max_age=None, resources=RESOURCES):
+        """
+        新しい記録があるリソースだけを取得
+
+        search は通常の応答ではほとんど更新されず、60秒ごとにリセットされるため、
+        リソースごとに新しさを判定する
+
+        Returns:
+            dict: {resource: {'limit', 'remaining', 'reset', 'updated_at'}}
+                  （未記録・max_age秒より古い・リセット済みのリソースは含まない）
+        """
+        max_age = DEFAULT_MAX_AGE if max_age is None else max_age
+        now = time.time()
+        with self._locked(exclusive=False):
+            entry = self._load().get(token_key(github_token), {})
+
+        return {
+            resource: entry[resource]
+            for resource in resources
+            if entry.get(resource)
+            and now - entry[resource]['updated_at'] <= max_age
+            and entry[resource]['reset'] > now
+        }
+
+    def read(self, github_token, max_age=None, resources=RESOURCES):
+        """
+        新しい記録を取得
+
+        Returns:
+            dict: {resource: {'limit', 'remaining', 'reset', 'updated_at'}}。
+                  指定リソースのいずれかが未記録・max_age秒より古い・リセット済みの場合はNone
+        """
+        recorded = self.fresh(github_token, max_age, resources)
+        return recorded if len(recorded) == len(resources) else None
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+条件付きリクエスト（ETag / Last-Modified）対応のGitHub RESTクライアント
+応答をSQLiteに保存し、変化がなければ304（レート制限にカウントされない）で再利用します
+"""
+
+import os
+import re
+import json
+import sqlite3
+import threading
+from urllib.parse import urlencode
+
+from github import GithubException
+
+import http_client
+
+API_ROOT = "https://api.github.com"
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "github_http_cache.sqlite3")
+
+class GitHubRestClient:
+    """ETagキャッシュ付きのGitHub REST APIクライアント"""
+
+    def __init__(self, token=None, cache_path=None, token_pool=None, ledger=None):
+        """
+        Args:
+            token: GitHub Personal Access Token（Noneなら匿名）
+            cache_path: 応答キャッシュのSQLiteファイルのパス
+            token_pool: GitHubTokenPool（指定時はリクエストごとにTokenを選ぶ）
+            ledger: QuotaLedger（Tokenプールを使わない場合の残り回数の記録先）
+        """
+        self.token = token
+        self.token_pool = token_pool
+        self.ledger = ledger
+        self.cache_path = cache_path or DEFAULT_CACHE_PATH
+        self._lock = threading.Lock()
+        self.stats = {
+            'requests': 0,
+            'not_modified': 0,
+            'cache_misses': 0,
+        }
+
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS github_http_cache (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    link TEXT,
+                    body TEXT NOT NULL
+                )
+            """)
+            # 応答から求めた値（最新コミットSHAごとのコミット数など）
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS github_derived_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                )
+            """)
+
+    def _connect(self):
+        return sqlite3.connect(self.cache_path, timeout=30)
+
+    @staticmethod
+    def _headers(token):
+        headers = {'Accept': 'application/vnd.github+json'}
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        return headers
+
+    @staticmethod
+    def _is_rate_limited(response):
+        return response.status_code == 429 or (
+            response.status_code == 403 and response.headers.get('X-RateLimit-Remaining') == '0'
+        )
+
+    def get(self, path, params=None):
+        """
+        GETリクエスト（キャッシュがあれば条件付きで送信）
+
+        Returns:
+            (JSON本文, Linkヘッダー)
+
+        Raises:
+            GithubException: 4xx/5xx応答
+        """
+        url = f"{API_ROOT}{path}"
+        if params:
+            url += "?" + urlencode(sorted(params.items()))
+
+        with self._connect() as conn:
+            cached = conn.execute(
+                "SELECT etag, last_modified, link, body FROM github_http_cache WHERE url = ?", (url,)
+            ).fetchone()
+
+        attempts = max(len(self.token_pool), 1) + 1 if self.token_pool else 1
+        for _ in range(attempts):
+            token = self.token_pool.acquire('core') if self.token_pool else self.token
+            headers = self._headers(token)
+            if cached:
+                if cached[0]:
+                    headers['If-None-Match'] = cached[0]
+                if cached[1]:
+                    headers['If-Modified-Since'] = cached[1]
+
+            response = http_client.get(url, headers=headers, timeout=30)
+
+            with self._lock:
+                self.stats['requests'] += 1
+
+            if not self.token_pool:
+                if self.ledger:
+                    self.ledger.record_headers(token, response.headers)
+                break
+            self.token_pool.update_from_headers(token, response.headers)
+            if not self._is_rate_limited(response):
+                break
+            # 枯渇したTokenを外して別のTokenで再試行
+            reset = response.headers.get('X-RateLimit-Reset')
+            self.token_pool.mark_exhausted(token, 'core', float(reset) if reset else None)
+
+        if response.status_code == 304 and cached:
+            with self._lock:
+                self.stats['not_modified'] += 1
+            return json.loads(cached[3]), cached[2] or ''
+
+        if response.status_code >= 400:
+            try:
+                data = response.json()
+            except ValueError:
+                data = {'message': response.text}
+            raise GithubException(response.status_code, data, dict(response.headers))
+
+        with self._lock:
+            self.stats['cache_misses'] += 1
+
+        link = response.headers.get('Link', '')
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO github_http_cache (url, etag, last_modified, link, body) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (url, etag, last_modified, link, response.text)
+                )
+        return response.json(), link
+
+    def load_value(self, key):
+        """応答から求めて保存した値を取得（なければNone）"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM github_derived_cache WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_value(self, key, value):
+        """応答から求めた値を保存"""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO github_derived_cache (key, value) VALUES (?, ?)",
+                (key, json.dumps(value, ensure_ascii=False))
+            )
+
+    @staticmethod
+    def last_page(link):
+        """Linkヘッダーの rel="last" からページ番号を取得（なければNone）"""
+        match = re.search(r'[?&]page=(\d+)[^>]*>;\s*rel="last"', link or '')
+        return int(match.group(1)) if match else None
+
+    def summary(self):
+        """キャッシュ利用状況（304はGitHubのレート制限にカウントされない）"""
+        with self._lock:
+            stats = dict(self.stats)
+        stats['quota_saved'] = stats['not_modified']
+        return stats
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+複数GitHub Tokenのプール
+Tokenごとに core/search/graphql の残り回数とリセット時刻を追跡し、
+残りが最も多いTokenにリクエストを振り分けます。全Tokenが枯渇した場合は
+最も早いリセット時刻まで待機します
+"""
+
+import time
+import threading
+
+from check_rate_limit import load_tokens, mask_token, fetch_rate_limits
+
+RESOURCES = ('core', 'search', 'graphql')
+
+class GitHubTokenPool:
+    """残りクォータに応じてTokenを選ぶプール"""
+
+    def __init__(self, tokens=None, sleep=time.sleep, ledger=None):
+        """
+        Args:
+            tokens: Tokenのリスト（Noneなら GITHUB_TOKENS / GITHUB_TOKEN から読み込む）
+            sleep: 待機関数
+            ledger: QuotaLedger（指定時は初期値を台帳から読み、更新を台帳に書き込む）
+
+        台帳に記録のないTokenは、起動時に rate_limit API で残り回数を取得する
+        """
+        self.tokens = list(tokens) if tokens is not None else load_tokens()
+        self._sleep = sleep
+        self._ledger = ledger
+        self._lock = threading.Lock()
+        # 未取得のTokenは上限まで残っているものとして扱う（limit=None）
+        self._state = {
+            token: {name: {'limit': None, 'remaining': None, 'reset': 0.0} for name in RESOURCES}
+            for token in self.tokens
+        }
+        unknown = list(self.tokens)
+        if ledger:
+            for token in self.tokens:
+                for name in RESOURCES:
+                    # リセット前の記録であれば古くても初期値として使う
+                    recorded = ledger.read(token, max_age=float('inf'), resources=(name,))
+                    if recorded:
+                        values = recorded[name]
+                        self._state[token][name] = {k: values[k] for k in ('limit', 'remaining', 'reset')}
+                        if token in unknown:
+                            unknown.remove(token)
+        if unknown:
+            self.refresh(unknown)
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def _headroom(self, token, resource, now):
+        state = self._state[token][resource]
+        if state['remaining'] is None or state['reset'] <= now:
+            # 未計測、またはリセット時刻を過ぎたものは満タンとみなす
+            return float('inf') if state['limit'] is None else state['limit']
+        return state['remaining']
+
+    def acquire(self, resource='core'):
+        """
+        残りが最も多いTokenを返す（全Tokenが枯渇していればリセットまで待機）
+
+        Returns:
+            str: Token（プールが空ならNone）
+        """
+        if not self.tokens:
+            return None
+
+        while True:
+            with self._lock:
+                now = time.time()
+                best = max(self.tokens, key=lambda t: self._headroom(t, resource, now))
+                if self._headroom(best, resource, now) > 0:
+                    state = self._state[best][resource]
+                    if state['remaining'] is not None and state['reset'] > now:
+                        state['remaining'] -= 1  # 応答ヘッダーで補正されるまでの見込み値
+                    return best
+                wait = min(self._state[t][resource]['reset'] for t in self.tokens) - now
+
+            print(f"[INFO] 全Tokenの{resource}クォータが枯渇しました。リセットまで{max(wait, 0):.0f}秒待機します")
+            self._sleep(max(wait, 0) + 1)
+
+    def update_from_headers(self, token, headers):
+        """応答の X-RateLimit-* ヘッダーで残り回数を更新"""
+        if token not in self._state or 'X-RateLimit-Remaining' not in headers:
+            return
+        if self._ledger:
+            self._ledger.record_headers(token, headers)
+        resource = headers.get('X-RateLimit-Resource', 'core')
+        if resource not in RESOURCES:
+            return
+        with self._lock:
+            self._state[token][resource] = {
+                'limit': int(headers.get('X-RateLimit-Limit', 0)),
+                'remaining': int(headers['X-RateLimit-Remaining']),
+                'reset': float(headers.get('X-RateLimit-Reset', 0)),
+            }
+
+    def mark_exhausted(self, token, resource='core', reset=None):
+        """403/429応答を受けたTokenを枯渇扱いにする"""
+        if token not in self._state:
+            return
+        with self._lock:
+            state = self._state[token][resource]
+            state['remaining'] = 0
+            state['reset'] = reset or max(state['reset'], time.time() + 60)
+
+    def refresh(self, tokens=None):
+        """
+        レート制限をAPIから取得し直す（rate_limit APIはクォータを消費しない）
+
+        Args:
+            tokens: 対象のToken（Noneなら全Token）
+        """
+        for token in (self.tokens if tokens is None else tokens):
+            try:
+                limits = fetch_rate_limits(token)
+            except Exception as e:
+                print(f"[WARNING] レート制限の取得に失敗: {mask_token(token)} - {type(e).__name__}")
+                continue
+            with self._lock:
+                self._state[token] = limits
+            if self._ledger:
+                self._ledger.record(token, limits)
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+外部問い合わせ用の共有HTTPクライアント
+ホストごとのKeep-Alive接続プール、Retry-Afterを考慮したジッター付き指数バックオフ、
+ホストごとの同時接続数制限、リクエスト時間の計測を提供します
+"""
+
+import os
+import time
+import random
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# ホストごとの同時接続数上限（未指定ホストは DEFAULT_HOST_LIMIT）
+HOST_LIMITS = {
+    'serpapi.com': 4,
+    'jvndb.jvn.jp': 2,
+    'api.github.com': 4,
+}
+DEFAULT_HOST_LIMIT = 8
+
+class HttpClient:
+    """ホスト単位でSessionを共有するHTTPクライアント"""
+
+    def __init__(self, max_retries=None, backoff_base=0.5, backoff_max=30.0, host_limits=None):
+        """
+        Args:
+            max_retries: 再試行回数（既定は環境変数 HTTP_MAX_RETRIES または 3）
+            backoff_base: バックオフの基準秒数
+            backoff_max: 1回の待機の上限秒数
+            host_limits: ホストごとの同時接続数上限
+        """
+        self.max_retries = max_retries if max_retries is not None else int(os.environ.get('HTTP_MAX_RETRIES', '3'))
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.host_limits = dict(HOST_LIMITS, **(host_limits or {}))
+
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._metrics = {}
+
+    def _host_state(self, host):
+        """ホストごとのSession・統計を取得（初回のみ生成）"""
+        with self._lock:
+            if host not in self._sessions:
+                limit = self.host_limits.get(host, DEFAULT_HOST_LIMIT)
+                session = requests.Session()
+                # 接続が全て使用中なら空くまで待つ（stream=True の接続は本文を読み終えるか close() するまで使用中）
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=limit, pool_block=True)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._sessions[host] = session
+                self._metrics[host] = {
+                    'requests': 0,
+                    'errors': 0,
+                    'retries': 0,
+                    'total_seconds': 0.0,
+                    'max_seconds': 0.0,
+                }
+            return self._sessions[host], self._metrics[host]
+
+    def _record(self, metrics, elapsed, error=False):
+        with self._lock:
+            metrics['requests'] += 1
+            metrics['total_seconds'] += elapsed
+            metrics['max_seconds'] = max(metrics['max_seconds'], elapsed)
+            if error:
+                metrics['errors'] += 1
+
+    def _retry_delay(self, attempt, response=None):
+        """Retry-Afterがあればそれに従い、なければジッター付き指数バックオフ"""
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after:
+                try:
+                    delay = float(retry_after)
+                except ValueError:
+                    try:
+                        delay = (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds()
+                    except (TypeError, ValueError):
+                        delay = None
+                if delay is not None:
+                    return min(max(delay, 0.0), self.backoff_max)
+        # フルジッター: 0 ～ base * 2^attempt
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def request(self, method, url, **kwargs):
+        """
+        リクエストを送信（一時的な失敗は再試行）
+
+        最後の試行で再試行対象のステータスが返った場合は、そのレスポンスを返す
+        （呼び出し側の raise_for_status で扱う）
+
+        Raises:
+            requests.exceptions.RequestException: 再試行後も通信に失敗した場合
+        """
+        host = urlsplit(url).hostname or ''
+        session, metrics = self._host_state(host)
+
+        attempt = 0
+        while True:
+            started = time.monotonic()
+            try:
+                response = session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                self._record(metrics, time.monotonic() - started, error=True)
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._retry_delay(attempt)
+            else:
+                retryable = response.status_code in RETRY_STATUS
+                self._record(metrics, time.monotonic() - started, error=response.status_code >= 400)
+                if not retryable or attempt >= self.max_retries:
+                    return response
+                delay = self._retry_delay(attempt, response)
+                response.close()
+
+            with self._lock:
+                metrics['retries'] += 1
+            time.sleep(delay)
+            attempt += 1
+
+    def get(self, url, **kwargs):
+        """requests.get 互換のGET"""
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        """requests.post 互換のPOST"""
+        return self.request('POST', url, **kwargs)
+
+    def metrics(self):
+        """ホストごとのリクエスト統計を返す"""
+        with self._lock:
+            return {
+                host: dict(
+                    m,
+                    total_seconds=round(m['total_seconds'], 3),
+                    max_seconds=round(m['max_seconds'], 3),
+                    avg_seconds=round(m['total_seconds'] / m['requests'], 3) if m['requests'] else 0.0,
+                )
+                for host, m in self._metrics.items()
+            }
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+def get_client():
+    """プロセス共有のクライアントを取得"""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = HttpClient()
+        return _default_client
+
+def get(url, **kwargs):
+    """共有クライアントでGET（requests.get 互換）"""
+    return get_client().get(url, **kwargs)
+
+def post(url, **kwargs):
+    """共有クライアントでPOST（requests.post 互換）"""
+    return get_client().post(url, **kwargs)
+
+def metrics():
+    """共有クライアントのホストごとの統計"""
+    return get_client().metrics() if _default_client else {}
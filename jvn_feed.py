@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MyJVN getVulnOverviewList の逐次パーサー
+全ページを startItem/maxCountItem で辿り、脆弱性を1件ずつ返します（メモリ使用量は一定）
+"""
+
+import time
+import xml.etree.ElementTree as ET
+
+import http_client
+
+API_URL = "https://jvndb.jvn.jp/myjvn"
+PAGE_SIZE = 50  # MyJVNの1リクエストあたり最大取得件数
+CHUNK_SIZE = 64 * 1024
+
+class JVNFeedError(Exception):
+    """MyJVN APIがエラーステータスを返した"""
+
+
+def _local_name(tag):
+    """'{namespace}name' から name を取り出す"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _parse_item(item):
+    """item要素を脆弱性レコードに変換"""
+    record = {
+        'id': '',
+        'title': '',
+        'link': '',
+        'description': '',
+        'issued': '',
+        'modified': '',
+        'products': [],
+    }
+    for child in item:
+        name = _local_name(child.tag)
+        text = (child.text or '').strip()
+        if name == 'identifier':
+            record['id'] = text
+        elif name in ('title', 'link', 'description', 'issued', 'modified'):
+            record[name] = text
+        elif name == 'date' and not record['modified']:
+            record['modified'] = text
+        elif name == 'cpe':
+            record['products'].append((child.get('vendor', ''), child.get('product', '')))
+    record['published_date'] = record['issued']
+    return record
+
+
+def _stream_page(response, status):
+    """
+    1ページ分のレスポンスを逐次解析し、itemを1件ずつ返す
+
+    Args:
+        response: stream=Trueで取得したレスポンス
+        status: Status要素の属性を格納するdict
+    """
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    root = None
+
+    def drain():
+        nonlocal root
+        for event, elem in parser.read_events():
+            if event == 'start':
+                if root is None:
+                    root = elem
+                continue
+            name = _local_name(elem.tag)
+            if name == 'item':
+                yield _parse_item(elem)
+                # 処理済みの要素を木から外してメモリを一定に保つ
+                elem.clear()
+                if root is not None and elem in root:
+                    root.remove(elem)
+            elif name == 'Status':
+                status.update(elem.attrib)
+            elif name == 'errMsg' and elem.text:
+                status.setdefault('errMsg', elem.text)
+
+    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+        parser.feed(chunk)
+        yield from drain()
+    parser.close()
+    yield from drain()
+
+
+def iter_vuln_overview(params, get=None, page_size=PAGE_SIZE, timeout=30, page_interval=0.0, max_items=None):
+    """
+    getVulnOverviewList の全ページを辿り、脆弱性レコードを到着順に返す
+
+    Args:
+        params: method/startItem/maxCountItem 以外の検索パラメータ
+        get: HTTP GET関数（既定は共有HTTPクライアント）
+        page_size: 1ページあたりの取得件数
+        page_interval: ページ間の待機秒数
+        max_items: 取得件数の上限（Noneなら全件）
+
+    Raises:
+        JVNFeedError: APIがエラーを返した場合
+        requests.exceptions.RequestException: 通信エラー（再試行後）
+        xml.etree.ElementTree.ParseError: XML解析エラー
+    """
+    get = get or http_client.get
+    start_item = 1
+    returned = 0
+
+    while True:
+        page_params = dict(params, method='getVulnOverviewList', startItem=start_item, maxCountItem=page_size)
+        response = get(API_URL, params=page_params, timeout=timeout, stream=True)
+        status = {}
+        page_count = 0
+        try:
+            response.raise_for_status()
+            for record in _stream_page(response, status):
+                page_count += 1
+                returned += 1
+                yield record
+                if max_items is not None and returned >= max_items:
+                    return
+        finally:
+            response.close()
+
+        if status.get('errMsg'):
+            raise JVNFeedError(status['errMsg'])
+
+        total = int(status.get('totalRes') or 0)
+        start_item += page_count
+        if page_count == 0 or start_item > total:
+            return
+        if page_interval:
+            time.sleep(page_interval)
+
+
+def probe_vuln_overview(params, get=None, timeout=30):
+    """
+    1件分のページだけを取得し、(総件数, 先頭のレコード または None) を返す
+
+    Raises:
+        JVNFeedError / requests.exceptions.RequestException / ParseError
+    """
+    get = get or http_client.get
+    page_params = dict(params, method='getVulnOverviewList', startItem=1, maxCountItem=1)
+    response = get(API_URL, params=page_params, timeout=timeout, stream=True)
+    status = {}
+    first = None
+    try:
+        response.raise_for_status()
+        for record in _stream_page(response, status):
+            first = first or record
+    finally:
+        response.close()
+
+    if status.get('errMsg'):
+        raise JVNFeedError(status['errMsg'])
+    return int(status.get('totalRes') or 0), first
+
+
+def count_vuln_overview(params, get=None, timeout=30):
+    """
+    件数のみを取得（1件分のページを読み、Statusの totalRes を返す）
+
+    Raises:
+        JVNFeedError / requests.exceptions.RequestException / ParseError
+    """
+    total, _ = probe_vuln_overview(params, get=get, timeout=timeout)
+    return total
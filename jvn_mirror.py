@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JVN iPedia 脆弱性情報のローカルミラー
+MyJVN getVulnOverviewList を過去5年分同期し、キーワード/製品名の索引から検索します
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta
+
+import requests
+
+from jvn_feed import iter_vuln_overview, JVNFeedError
+
+DEFAULT_MIRROR_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "jvn_mirror.sqlite3")
+
+class JVNMirror:
+    """JVN iPediaの概要データをSQLiteに保持するミラー"""
+
+    def __init__(self, path=None, years=5):
+        """
+        Args:
+            path: SQLiteファイルのパス
+            years: 保持する期間（年、初回公開日基準）
+        """
+        self.path = path or DEFAULT_MIRROR_PATH
+        self.years = years
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS vulns (
+                    vuln_id TEXT PRIMARY KEY,
+                    title TEXT,
+                    link TEXT,
+                    description TEXT,
+                    issued TEXT,
+                    modified TEXT,
+                    products TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_vulns_issued ON vulns(issued)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS products (
+                    vuln_id TEXT NOT NULL,
+                    vendor TEXT,
+                    product TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_products_product ON products(product COLLATE NOCASE)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_products_vuln ON products(vuln_id)")
+            conn.execute("CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT)")
+            # キーワード索引（trigramで日本語・部分一致に対応）
+            conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS vulns_fts USING fts5(
+                    vuln_id UNINDEXED, title, description, products, tokenize='trigram'
+                )
+            """)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    # ------------------------------------------------------------
+    # 同期
+    # ------------------------------------------------------------
+    def last_synced(self):
+        """最終同期日時を返す（未同期ならNone）"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM sync_state WHERE key = 'last_synced'").fetchone()
+        return datetime.fromisoformat(row[0]) if row else None
+
+    def is_fresh(self, max_age_hours=48):
+        """ミラーが指定時間内に同期されているか"""
+        last = self.last_synced()
+        return last is not None and datetime.now() - last <= timedelta(hours=max_age_hours)
+
+    def sync(self, full=False):
+        """
+        MyJVNから差分を取得してミラーを更新
+
+        初回（またはfull=True）は過去years年に初回公開された項目を全件取得し、
+        以降は前回同期日以降に更新された項目のみを取得する
+
+        Returns:
+            dict: 取得件数と同期モード
+        """
+        started_at = datetime.now()
+        last = None if full else self.last_synced()
+        cutoff = started_at - timedelta(days=365 * self.years)
+
+        if last is None:
+            mode = "full"
+            params = {
+                'rangeDatePublic': 'n',
+                'rangeDatePublished': 'n',
+                'rangeDateFirstPublished': 'n',
+                'dateFirstPublishedStartY': cutoff.year,
+                'dateFirstPublishedStartM': cutoff.month,
+                'dateFirstPublishedStartD': cutoff.day,
+            }
+        else:
+            mode = "incremental"
+            since = last - timedelta(days=1)  # 日単位指定のため1日重ねて取得
+            params = {
+                'rangeDatePublic': 'n',
+                'rangeDatePublished': 'n',
+                'rangeDateFirstPublished': 'n',
+                'datePublishedStartY': since.year,
+                'datePublishedStartM': since.month,
+                'datePublishedStartD': since.day,
+            }
+
+        fetched = 0
+        with self._connect() as conn:
+            for record in iter_vuln_overview(params, page_interval=0.5):
+                if record['issued'] and record['issued'][:10] < cutoff.strftime('%Y-%m-%d'):
+                    continue
+                self._upsert(conn, record)
+                fetched += 1
+
+            # 保持期間外の項目を削除
+            cutoff_str = cutoff.strftime('%Y-%m-%d')
+            stale = [row[0] for row in conn.execute("SELECT vuln_id FROM vulns WHERE issued < ?", (cutoff_str,))]
+            for vuln_id in stale:
+                self._delete(conn, vuln_id)
+
+            conn.execute(
+                "INSERT OR REPLACE INTO sync_state (key, value) VALUES ('last_synced', ?)",
+                (started_at.isoformat(),)
+            )
+
+        return {'mode': mode, 'fetched': fetched, 'removed': len(stale)}
+
+    def _upsert(self, conn, record):
+        self._delete(conn, record['id'])
+        products_text = " / ".join(f"{vendor} {product}".strip() for vendor, product in record['products'])
+        conn.execute(
+            "INSERT INTO vulns (vuln_id, title, link, description, issued, modified, products) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (record['id'], record['title'], record['link'], record['description'],
+             record['issued'], record['modified'], products_text)
+        )
+        conn.executemany(
+            "INSERT INTO products (vuln_id, vendor, product) VALUES (?, ?, ?)",
+            [(record['id'], vendor, product) for vendor, product in record['products']]
+        )
+        conn.execute(
+            "INSERT INTO vulns_fts (vuln_id, title, description, products) VALUES (?, ?, ?, ?)",
+            (record['id'], record['title'], record['description'], products_text)
+        )
+
+    @staticmethod
+    def _delete(conn, vuln_id):
+        conn.execute("DELETE FROM vulns WHERE vuln_id = ?", (vuln_id,))
+        conn.execute("DELETE FROM products WHERE vuln_id = ?", (vuln_id,))
+        conn.execute("DELETE FROM vulns_fts WHERE vuln_id = ?", (vuln_id,))
+
+    # ------------------------------------------------------------
+    # 検索
+    # ------------------------------------------------------------
+    def search(self, keyword, years=None):
+        """
+        キーワード（製品名・タイトル・概要）で脆弱性を検索
+
+        Returns:
+            list: check_jvn.JVNChecker と同じ形式の脆弱性リスト（公開日の新しい順）
+        """
+        years = years or self.years
+        cutoff = (datetime.now() - timedelta(days=365 * years)).strftime('%Y-%m-%d')
+        keyword = keyword.strip()
+        if not keyword:
+            return []
+
+        with self._connect() as conn:
+            if len(keyword) >= 3:
+                # trigram索引はフレーズ一致で部分文字列検索になる
+                phrase = '"' + keyword.replace('"', '""') + '"'
+                ids = {row[0] for row in conn.execute(
+                    "SELECT vuln_id FROM vulns_fts WHERE vulns_fts MATCH ?", (phrase,)
+                )}
+            else:
+                # trigramが効かない短いキーワードは製品名の完全一致で検索
+                ids = {row[0] for row in conn.execute(
+                    "SELECT vuln_id FROM products WHERE product = ? COLLATE NOCASE", (keyword,)
+                )}
+
+            if not ids:
+                return []
+
+            placeholders = ",".join("?" * len(ids))
+            rows = conn.execute(
+                f"SELECT vuln_id, title, link, description, issued FROM vulns "
+                f"WHERE vuln_id IN ({placeholders}) AND issued >= ? ORDER BY issued DESC",
+                (*ids, cutoff)
+            ).fetchall()
+
+        return [
+            {
+                'id': vuln_id,
+                'title': title,
+                'published_date': issued,
+                'link': link,
+                'description': description,
+            }
+            for vuln_id, title, link, description, issued in rows
+        ]
+
+    def count(self):
+        """ミラー内の件数"""
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM vulns").fetchone()[0]
+
+
+def lookup_local(software_name, years=5, allow_stale=False, path=None):
+    """
+    ローカルミラーから脆弱性を検索
+
+    ミラーが未同期、またはJVN_MIRROR_MAX_AGE_HOURS（既定48時間）より古い場合は
+    Noneを返す（allow_stale=Trueなら古いミラーでも同期済みであれば検索する）
+
+    Returns:
+        list または None
+    """
+    mirror_path = path or DEFAULT_MIRROR_PATH
+    if not os.path.exists(mirror_path):
+        return None
+
+    try:
+        mirror = JVNMirror(path=mirror_path, years=years)
+        max_age_hours = float(os.environ.get('JVN_MIRROR_MAX_AGE_HOURS', '48'))
+        if mirror.last_synced() is None:
+            return None
+        if not allow_stale and not mirror.is_fresh(max_age_hours):
+            return None
+        return mirror.search(software_name, years=years)
+    except sqlite3.Error:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JVN iPedia ローカルミラー")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    sync_parser = subparsers.add_parser("sync", help="MyJVNからミラーを同期")
+    sync_parser.add_argument("--full", action="store_true", help="差分ではなく全件を再取得")
+    sync_parser.add_argument("--years", type=int, default=5, help="保持期間（年）")
+
+    search_parser = subparsers.add_parser("search", help="ミラーからキーワード検索")
+    search_parser.add_argument("keyword", help="ソフトウェア名")
+
+    subparsers.add_parser("status", help="ミラーの状態を表示")
+
+    args = parser.parse_args()
+
+    if args.command == "sync":
+        mirror = JVNMirror(years=args.years)
+        print(f"[INFO] JVN iPediaミラーを同期中: {mirror.path}")
+        try:
+            result = mirror.sync(full=args.full)
+        except (requests.exceptions.RequestException, ET.ParseError, JVNFeedError) as e:
+            print(f"❌ 同期エラー: {e}")
+            sys.exit(1)
+        print(f"✅ 同期完了（{result['mode']}）: 取得 {result['fetched']}件 / 期限切れ削除 {result['removed']}件 / 総数 {mirror.count()}件")
+
+    elif args.command == "search":
+        mirror = JVNMirror()
+        started = time.monotonic()
+        vulnerabilities = mirror.search(args.keyword)
+        elapsed_ms = (time.monotonic() - started) * 1000
+        print(f"検出された脆弱性: {len(vulnerabilities)}件 （{elapsed_ms:.1f} ms）")
+        for vuln in vulnerabilities:
+            print(f"  {vuln['published_date'][:10]}  {vuln['id']}  {vuln['title']}")
+
+    elif args.command == "status":
+        mirror = JVNMirror()
+        last = mirror.last_synced()
+        print(f"ミラー: {mirror.path}")
+        print(f"最終同期: {last.strftime('%Y-%m-%d %H:%M:%S') if last else '未同期'}")
+        print(f"登録件数: {mirror.count()}件")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,494 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+審査待ちファイルの常駐監視
+data/pending/（ワークフロー申請CSV）と exceptions/requests/（例外申請CSV）を
+inotify（使えない環境ではポーリング）で監視し、書き込みが終わったファイルから順に
+ワーカープロセスで審査します。キュー長と処理時間は /metrics で公開します
+"""
+
+import io
+import os
+import sys
+import csv
+import json
+import time
+import signal
+import shutil
+import argparse
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import redirect_stdout
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+import workflow_audit
+from workflow_audit import WorkflowAuditor, open_exclusive
+from software_audit_dashboard import make_handler
+from dir_snapshot import InotifyWatcher, PENDING_MASK
+
+WORKFLOW = 'workflow'
+EXCEPTION = 'exception'
+
+WATCH_DIRS = {
+    WORKFLOW: Path("data/pending"),
+    EXCEPTION: Path("exceptions/requests"),
+}
+EXCEPTION_ARCHIVE_DIR = Path("exceptions/archived")
+EXCEPTION_REPORTS_DIR = Path("exceptions/reports")
+EXCEPTION_COLUMNS = ('申請ID', 'ソフトウェア名', 'GitHubリポジトリURL')
+SKIP_FILES = {'sample.csv'}
+
+# ============================================
+# ディレクトリ監視（inotify / ポーリング）
+# ============================================
+class PollingWatcher:
+    """一定間隔で全体を再走査する（inotify が使えない環境やWindowsドライブ上のディレクトリ用）"""
+
+    mode = 'polling'
+
+    def __init__(self, interval, stop_event):
+        self.interval = interval
+        self._stop = stop_event
+        self._next_poll = time.monotonic()
+
+    def wait(self, timeout):
+        """
+        Returns:
+            走査の時刻になったら None（全体を再走査）、それまでは空の集合
+        """
+        remaining = self._next_poll - time.monotonic()
+        if remaining > timeout:
+            self._stop.wait(timeout)
+            return set()
+        self._stop.wait(max(remaining, 0))
+        self._next_poll = time.monotonic() + self.interval
+        return None
+
+    def close(self):
+        pass
+
+
+def scan_pending(directories):
+    """監視対象のCSVファイルを (種別, パス) で列挙"""
+    found = []
+    for kind, directory in directories.items():
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if is_target(entry.name):
+                        found.append((kind, Path(entry.path)))
+        except OSError:
+            continue
+    return found
+
+def is_target(name):
+    return name.lower().endswith('.csv') and not name.startswith('.') and name not in SKIP_FILES
+
+# ============================================
+# 書き込み完了の判定
+# ============================================
+class StabilityTracker:
+    """サイズと更新時刻が一定時間変わらなくなったファイルを書き込み完了とみなす"""
+
+    def __init__(self, settle):
+        """
+        Args:
+            settle: 変化がないことを確認する時間（秒）
+        """
+        self.settle = settle
+        self.candidates = {}  # パス -> [種別, シグネチャ, 安定し始めた時刻, 最初に検知した時刻]
+        self._skipped = {}  # 審査に失敗したファイルのシグネチャ（内容が変わるまで再審査しない）
+
+    @staticmethod
+    def signature(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def observe(self, kind, path, now):
+        if path not in self.candidates:
+            self.candidates[path] = [kind, None, now, now]
+
+    def ready(self, now):
+        """
+        書き込みが終わったファイルを検知順に返す
+
+        Returns:
+            [(種別, パス, 最初に検知した時刻)]
+        """
+        ready = []
+        for path, state in list(self.candidates.items()):
+            sig = self.signature(path)
+            if sig is None:
+                del self.candidates[path]  # 削除・移動された
+                continue
+            if self._skipped.get(path) == sig:
+                del self.candidates[path]
+                continue
+            if sig != state[1]:
+                state[1], state[2] = sig, now
+            elif now - state[2] >= self.settle:
+                ready.append((state[0], path, state[3]))
+        ready.sort(key=lambda item: (item[2], str(item[1])))
+        return ready
+
+    def taken(self, path):
+        self.candidates.pop(path, None)
+
+    def skip(self, path):
+        """失敗したファイルを、書き換えられるまで候補から外す"""
+        sig = self.signature(path)
+        if sig is not None:
+            self._skipped[path] = sig
+
+# ============================================
+# ワーカープロセス
+# ============================================
+def _init_daemon_worker(report_page_size, decision_cache, rules_interval):
+    # Ctrl+C は親プロセスが受けて処理中のファイルを最後まで終わらせるため、ワーカーでは無視する
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    workflow_audit._init_worker(report_page_size, decision_cache)
+    workflow_audit._worker_auditor.watch_rules(rules_interval)
+
+def read_exception_requests(csv_file):
+    """
+    例外申請CSV（exceptions/exception_template.csv の形式、1行目はヘッダー）を読み込む
+
+    Returns:
+        list: 各行の辞書
+
+    Raises:
+        ValueError: 必要な列がない（ほかの形式のCSV）
+    """
+    with open(csv_file, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.DictReader(f)
+        missing = [column for column in EXCEPTION_COLUMNS if column not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"例外申請の形式ではありません（列がありません: {', '.join(missing)}）")
+        return [row for row in reader if (row.get('申請ID') or '').strip()]
+
+def _audit_exception_requests(csv_file):
+    """
+    例外申請の各行を audit_exceptions_auto.sh と同じく ソフトウェア名 + リポジトリURL で審査し、
+    レポートを exceptions/reports/<申請ID>_<レポート名> にコピーする
+
+    Returns:
+        判定の要約
+
+    Raises:
+        ValueError: 例外申請の形式でない、または審査できる行がない
+    """
+    from audit_software_list import audit_software_list
+
+    requests = read_exception_requests(csv_file)
+    entries = {}
+    invalid = 0
+    for row in requests:
+        app_id = row['申請ID'].strip()
+        name = (row.get('ソフトウェア名') or '').strip()
+        url = (row.get('GitHubリポジトリURL') or '').strip()
+        if not name or not url:
+            print(f"  ❌ {app_id}: データ不正（ソフトウェア名またはリポジトリURLがありません）")
+            invalid += 1
+            continue
+        # 同じソフトウェアの申請は1回だけ審査する（レポートは申請ごとにコピー）
+        entries.setdefault(name, (url, []))[1].append(app_id)
+    if not entries:
+        raise ValueError("審査できる申請がありません")
+
+    EXCEPTION_REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+    passed = failed = 0
+    audited = audit_software_list([(name, url) for name, (url, _) in entries.items()])
+    for name, report_path, ok, _since in audited:
+        for app_id in entries[name][1]:
+            shutil.copy2(report_path, EXCEPTION_REPORTS_DIR / f"{app_id}_{Path(report_path).name}")
+            print(f"  {'✅' if ok else '❌'} {app_id}: {name} → {Path(report_path).name}")
+            if ok:
+                passed += 1
+            else:
+                failed += 1
+    return f"合格 {passed}件 / 不合格 {failed}件 / データ不正 {invalid}件"
+
+def _run_job(kind, csv_file):
+    """
+    1ファイルを審査する（ワーカープロセス内）
+
+    Returns:
+        (判定の要約, 出力, エラー, 開始時刻, 終了時刻)
+    """
+    started = time.time()
+    if kind == WORKFLOW:
+        result, output = workflow_audit._process_in_worker(csv_file)
+        counts = result['counts'] or {}
+        verdict = (f"承認 {counts.get('approved', 0)}件 / 却下 {counts.get('rejected', 0)}件 / "
+                   f"要手動審査 {counts.get('manual_review', 0)}件")
+        return verdict, output, result['error'], started, time.time()
+
+    buffer = io.StringIO()
+    verdict = error = None
+    with redirect_stdout(buffer):
+        try:
+            verdict = _audit_exception_requests(csv_file)
+            # 審査済みの申請は手動実行時と同じく exceptions/archived/ へ移す
+            placeholder, archive_path = open_exclusive(EXCEPTION_ARCHIVE_DIR / Path(csv_file).name)
+            placeholder.close()
+            os.replace(csv_file, archive_path)
+            print(f"📦 アーカイブ: {archive_path}")
+        except Exception as e:
+            print(f"❌ エラー: {Path(csv_file).name} - {str(e)}")
+            error = str(e)
+    return verdict, buffer.getvalue(), error, started, time.time()
+
+# ============================================
+# 常駐処理
+# ============================================
+class PendingWatcher:
+    """監視・書き込み完了の判定・上限付きの投入・結果の集計を行う"""
+
+    def __init__(self, workers=1, queue_size=4, settle=1.0, poll_interval=2.0, rescan_interval=60.0,
+                 force_polling=False, report_page_size=0, decision_cache=True,
+                 rules_interval=5.0):
+        """
+        Args:
+            workers: 審査するワーカープロセス数
+            queue_size: 実行中のほかに投入しておける件数（超えたファイルはディレクトリに残して待つ）
+            settle: 書き込み完了とみなすまでの無変化時間（秒）
+            poll_interval: ポーリング時の走査間隔（秒）
+            rescan_interval: inotify 使用時にも取りこぼし防止で全体を再走査する間隔（秒）
+            force_polling: inotify を使わずポーリングする
+        """
+        self.workers = max(1, workers)
+        self.max_in_flight = self.workers + max(0, queue_size)
+        self.rescan_interval = rescan_interval
+        self.tracker = StabilityTracker(settle)
+        self._stop = threading.Event()
+        self._in_flight = {}  # future -> (種別, パス, 検知時刻, 投入時刻)
+        self.stats = {
+            'processed': 0, 'failed': 0, 'throttled': 0,
+            'latency_last': 0.0, 'latency_total': 0.0, 'latency_max': 0.0,
+            'wait_total': 0.0, 'processing_total': 0.0,
+        }
+        self.bodies = {}
+
+        # WorkflowAuditor が作るディレクトリ（data/pending など）を監視開始前に用意する
+        WorkflowAuditor(report_page_size=report_page_size)
+        for directory in list(WATCH_DIRS.values()) + [EXCEPTION_ARCHIVE_DIR]:
+            directory.mkdir(parents=True, exist_ok=True)
+
+        self.watcher = None
+        if not force_polling:
+            try:
+                self.watcher = InotifyWatcher(WATCH_DIRS.values(), PENDING_MASK)
+            except OSError as e:
+                print(f"[WARNING] inotify が使えないためポーリングで監視します: {e}")
+        if self.watcher is None:
+            self.watcher = PollingWatcher(poll_interval, self._stop)
+
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_daemon_worker,
+            initargs=(report_page_size, decision_cache, rules_interval))
+        self._publish()
+
+    def stop(self, *_args):
+        """停止を要求（処理中のファイルは最後まで審査してから終了）"""
+        self._stop.set()
+
+    def status(self):
+        """キュー長・処理時間などの現在値"""
+        processed = self.stats['processed'] + self.stats['failed']
+        return {
+            'mode': self.watcher.mode,
+            'workers': self.workers,
+            'queue_limit': self.max_in_flight,
+            'queue_depth': len(self._in_flight),
+            'waiting_files': len(self.tracker.candidates),
+            'backpressure': len(self._in_flight) >= self.max_in_flight,
+            'processed': self.stats['processed'],
+            'failed': self.stats['failed'],
+            'throttled': self.stats['throttled'],
+            'latency_seconds_last': round(self.stats['latency_last'], 3),
+            'latency_seconds_avg': round(self.stats['latency_total'] / processed, 3) if processed else 0.0,
+            'latency_seconds_max': round(self.stats['latency_max'], 3),
+            'queue_wait_seconds_avg': round(self.stats['wait_total'] / processed, 3) if processed else 0.0,
+            'processing_seconds_avg': round(self.stats['processing_total'] / processed, 3) if processed else 0.0,
+            'generated_at_unix': time.time(),
+        }
+
+    def _publish(self):
+        status = self.status()
+        # 参照の差し替えだけで公開するため、応答側はロック不要
+        self.bodies = {
+            '/metrics': (render_prometheus(status).encode('utf-8'), 'text/plain; version=0.0.4; charset=utf-8'),
+            '/metrics.json': (json.dumps(status, ensure_ascii=False, indent=2).encode('utf-8'),
+                              'application/json; charset=utf-8'),
+        }
+
+    def _submit_ready(self, now):
+        for kind, path, detected in self.tracker.ready(now):
+            if len(self._in_flight) >= self.max_in_flight:
+                # 上限に達したらファイルはディレクトリに残したまま、空きができるまで投入しない
+                self.stats['throttled'] += 1
+                return
+            self.tracker.taken(path)
+            future = self.pool.submit(_run_job, kind, str(path))
+            self._in_flight[future] = (kind, path, detected, time.time())
+
+    def _collect(self, futures):
+        for future in futures:
+            kind, path, detected, submitted = self._in_flight.pop(future)
+            try:
+                verdict, output, error, started, finished = future.result()
+            except Exception as e:
+                # ワーカープロセス自体の異常終了もファイル単位のエラーとして扱う
+                verdict, output, error = None, "", str(e)
+                started = finished = time.time()
+            print(output, end='')
+            latency = finished - detected
+            self.stats['latency_last'] = latency
+            self.stats['latency_total'] += latency
+            self.stats['latency_max'] = max(self.stats['latency_max'], latency)
+            self.stats['wait_total'] += max(started - submitted, 0.0)
+            self.stats['processing_total'] += finished - started
+            if error:
+                self.stats['failed'] += 1
+                self.tracker.skip(path)
+                print(f"❌ {path.name}: {error}（検知から {latency:.1f}秒）")
+            else:
+                self.stats['processed'] += 1
+                print(f"✅ {path.name}: {verdict}（検知から {latency:.1f}秒）")
+            sys.stdout.flush()
+
+    def _in_flight_paths(self):
+        return {path for _kind, path, _detected, _submitted in self._in_flight.values()}
+
+    def run(self):
+        """停止が要求されるまで監視・審査を続ける"""
+        print(f"[INFO] 監視開始（{self.watcher.mode}）: "
+              f"{', '.join(str(d) for d in WATCH_DIRS.values())} "
+              f"(ワーカー数: {self.workers}, キュー上限: {self.max_in_flight})")
+        sys.stdout.flush()
+        changed = None  # 起動時は既存のファイルも対象にする
+        last_scan = 0.0
+        try:
+            while not self._stop.is_set():
+                now = time.time()
+                in_flight = self._in_flight_paths()
+                if changed is None or now - last_scan >= self.rescan_interval:
+                    for kind, path in scan_pending(WATCH_DIRS):
+                        if path not in in_flight:
+                            self.tracker.observe(kind, path, now)
+                    last_scan = now
+                else:
+                    for path in changed:
+                        kind = next((k for k, d in WATCH_DIRS.items() if d == path.parent), None)
+                        if kind and is_target(path.name) and path not in in_flight:
+                            self.tracker.observe(kind, path, now)
+
+                self._submit_ready(now)
+                self._publish()
+
+                # 停止要求に1秒以内に応じられるよう待ち時間を区切る。書き込み中のファイルが
+                # あれば完了判定のため、審査中のファイルがあれば結果の回収のため短く起きる
+                timeout = 1.0
+                if self.tracker.candidates:
+                    timeout = min(timeout, max(self.tracker.settle / 4, 0.05))
+                if self._in_flight:
+                    finished, _ = wait(list(self._in_flight), timeout=min(timeout, 0.2),
+                                       return_when=FIRST_COMPLETED)
+                    self._collect(finished)
+                    changed = self.watcher.wait(0)
+                else:
+                    changed = self.watcher.wait(timeout)
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        """投入済みのファイルの審査を待ってから終了（未投入のファイルは次回起動時に処理）"""
+        if self._in_flight:
+            print(f"[INFO] 処理中の {len(self._in_flight)} ファイルの完了を待って終了します")
+        self._collect(list(wait(list(self._in_flight)).done))
+        self.pool.shutdown(wait=True)
+        self.watcher.close()
+        self._publish()
+        print("[INFO] 監視を終了しました")
+
+
+def render_prometheus(status):
+    """Prometheusのテキスト形式に変換"""
+    gauges = [
+        ('pending_watcher_queue_depth', "投入済みで審査が終わっていないファイル数", status['queue_depth']),
+        ('pending_watcher_queue_limit', "投入できるファイル数の上限", status['queue_limit']),
+        ('pending_watcher_waiting_files', "書き込み完了待ち・空き待ちのファイル数", status['waiting_files']),
+        ('pending_watcher_backpressure', "投入を止めているかどうか（1 = 上限に到達）", int(status['backpressure'])),
+        ('pending_watcher_latency_seconds_last', "直近のファイルの検知から判定までの秒数", status['latency_seconds_last']),
+        ('pending_watcher_latency_seconds_avg', "検知から判定までの平均秒数", status['latency_seconds_avg']),
+        ('pending_watcher_latency_seconds_max', "検知から判定までの最大秒数", status['latency_seconds_max']),
+        ('pending_watcher_processing_seconds_avg', "1ファイルの審査にかかった平均秒数", status['processing_seconds_avg']),
+    ]
+    counters = [
+        ('pending_watcher_processed_total', "審査したファイル数", status['processed']),
+        ('pending_watcher_failed_total', "審査に失敗したファイル数", status['failed']),
+        ('pending_watcher_throttled_total', "上限に達して投入を見送った回数", status['throttled']),
+    ]
+    lines = []
+    for kind, metrics in (('gauge', gauges), ('counter', counters)):
+        for name, help_text, value in metrics:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {value}"]
+    return "\n".join(lines) + "\n"
+
+def serve_metrics(daemon, host, port):
+    """/metrics（Prometheus）と /metrics.json をバックグラウンドで提供"""
+    server = ThreadingHTTPServer((host, port), make_handler(daemon))
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    print(f"[INFO] メトリクスを提供中: http://{host}:{port}/metrics , /metrics.json")
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="審査待ちCSVの常駐監視（到着したファイルから順に審査）")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get('AUDIT_WORKERS', '1')),
+                        help="審査するワーカープロセス数（デフォルト: 1）")
+    parser.add_argument("--queue-size", type=int, default=4,
+                        help="実行中のほかに投入しておける件数（デフォルト: 4）")
+    parser.add_argument("--settle", type=float, default=1.0,
+                        help="サイズが変わらなくなってから審査を始めるまでの秒数（デフォルト: 1.0）")
+    parser.add_argument("--poll", action="store_true",
+                        help="inotify を使わずポーリングで監視する（/mnt/c などinotifyが届かない場所用）")
+    parser.add_argument("--poll-interval", type=float, default=2.0, help="ポーリング間隔（秒、デフォルト: 2.0）")
+    parser.add_argument("--rescan-interval", type=float, default=60.0,
+                        help="inotify 使用時の取りこぼし防止の再走査間隔（秒、デフォルト: 60）")
+    parser.add_argument("--report-page-size", type=int,
+                        default=int(os.environ.get('WORKFLOW_REPORT_PAGE_SIZE', '0')),
+                        help="HTMLレポートを判定ごとにこの行数でページ分割（デフォルト: 0 = 分割しない）")
+    parser.add_argument("--no-decision-cache", action="store_true",
+                        default=os.environ.get('WORKFLOW_DECISION_CACHE', '1') == '0',
+                        help="判定キャッシュ（cache/decision_cache.sqlite3）を使わない")
+    parser.add_argument("--host", default="127.0.0.1", help="メトリクスの待ち受けアドレス（デフォルト: 127.0.0.1）")
+    parser.add_argument("--metrics-port", type=int,
+                        default=int(os.environ.get('PENDING_WATCHER_METRICS_PORT', '0')),
+                        help="メトリクスの待ち受けポート（デフォルト: 0 = 提供しない）")
+    args = parser.parse_args()
+
+    daemon = PendingWatcher(
+        workers=args.workers, queue_size=args.queue_size, settle=args.settle,
+        poll_interval=args.poll_interval, rescan_interval=args.rescan_interval,
+        force_polling=args.poll, report_page_size=args.report_page_size,
+        decision_cache=not args.no_decision_cache)
+    signal.signal(signal.SIGINT, daemon.stop)
+    signal.signal(signal.SIGTERM, daemon.stop)
+
+    server = serve_metrics(daemon, args.host, args.metrics_port) if args.metrics_port else None
+    try:
+        daemon.run()
+    finally:
+        if server:
+            server.shutdown()
+            server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
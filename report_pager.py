@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+大容量レポート用ページャー
+ファイルをメモリマップし、行の開始位置の索引を必要な位置まで段階的に作ることで、
+GB単位のログでもファイル全体を読み込まずにページ送り・行ジャンプ・末尾表示・検索を行います
+"""
+
+import os
+import sys
+import mmap
+import shutil
+import argparse
+from array import array
+from bisect import bisect_right
+
+INDEX_CHUNK = 4 * 1024 * 1024  # 索引を一度に延ばす範囲（バイト）
+
+class LineIndex:
+    """メモリマップ上の行の開始位置（必要な位置まで遅延して作成）"""
+
+    def __init__(self, data):
+        """
+        Args:
+            data: mmap.mmap
+        """
+        self._data = data
+        self.offsets = array('Q', [0])
+        self._scanned = 0  # 索引作成済みのバイト位置
+        self.complete = len(data) == 0
+
+    def _extend(self):
+        end = min(self._scanned + INDEX_CHUNK, len(self._data))
+        find = self._data.find
+        pos = find(b'\n', self._scanned, end)
+        while pos != -1:
+            if pos + 1 < len(self._data):
+                self.offsets.append(pos + 1)
+            pos = find(b'\n', pos + 1, end)
+        self._scanned = end
+        self.complete = end >= len(self._data)
+
+    def line_start(self, line_no):
+        """
+        行の開始位置（行番号は0始まり）
+
+        Returns:
+            int: 開始位置（ファイルの行数を超える場合は最終行の開始位置）
+        """
+        while len(self.offsets) <= line_no and not self.complete:
+            self._extend()
+        return self.offsets[min(line_no, len(self.offsets) - 1)]
+
+    def line_of(self, offset, max_scan=None):
+        """
+        バイト位置を含む行の行番号（0始まり）
+
+        Args:
+            max_scan: 索引を延ばしてよい最大バイト数（超える場合はNoneを返す）
+        """
+        if max_scan is not None and not self.complete and offset - self._scanned >= max_scan:
+            return None
+        while self._scanned <= offset and not self.complete:
+            self._extend()
+        return bisect_right(self.offsets, offset) - 1
+
+    def line_count(self):
+        """総行数（索引を最後まで作成する）"""
+        while not self.complete:
+            self._extend()
+        return len(self.offsets)
+
+
+class ReportPager:
+    """メモリマップを使ったページャー"""
+
+    def __init__(self, path, page_size=None):
+        """
+        Args:
+            path: 表示するファイル
+            page_size: 1ページの行数（Noneなら端末の高さから決定）
+        """
+        self.path = path
+        self.page_size = page_size or max(shutil.get_terminal_size().lines - 4, 5)
+        self.size = os.path.getsize(path)
+        self._file = open(path, 'rb')
+        # 空ファイルはメモリマップできないため空のバイト列で代用
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b''
+        self.index = LineIndex(self._data)
+        self.top = 0  # 表示中のページ先頭行の開始位置
+        self._last_search = None
+
+    def close(self):
+        if self.size:
+            self._data.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ============================================
+    # 位置の移動
+    # ============================================
+    def _next_line(self, offset):
+        pos = self._data.find(b'\n', offset)
+        return self.size if pos == -1 else pos + 1
+
+    def _prev_line(self, offset):
+        if offset <= 0:
+            return 0
+        return self._data.rfind(b'\n', 0, offset - 1) + 1
+
+    def page_lines(self):
+        """表示中のページの行（デコード済み）"""
+        lines = []
+        pos = self.top
+        while len(lines) < self.page_size and pos < self.size:
+            end = self._next_line(pos)
+            lines.append(self._data[pos:end].rstrip(b'\r\n').decode('utf-8', errors='replace'))
+            pos = end
+        return lines
+
+    def next_page(self):
+        pos = self.top
+        for _ in range(self.page_size):
+            nxt = self._next_line(pos)
+            if nxt >= self.size:
+                return  # 最終ページ
+            pos = nxt
+        self.top = pos
+
+    def prev_page(self):
+        for _ in range(self.page_size):
+            self.top = self._prev_line(self.top)
+
+    def goto_line(self, line_no):
+        """指定行（1始まり）へ移動"""
+        self.top = self.index.line_start(max(line_no - 1, 0))
+
+    def tail(self):
+        """末尾のページへ移動（索引は作らず末尾から逆方向に探す）"""
+        pos = self.size
+        for _ in range(self.page_size):
+            pos = self._prev_line(pos)
+        self.top = pos
+
+    def search(self, text=None):
+        """
+        表示中の行の次から前方検索し、見つかった行へ移動
+
+        Returns:
+            bool: 見つかったかどうか
+        """
+        text = text or self._last_search
+        if not text or not self.size:
+            return False
+        self._last_search = text
+        hit = self._data.find(text.encode('utf-8'), self._next_line(self.top))
+        if hit == -1:
+            return False
+        self.top = self._prev_line(hit + 1)
+        return True
+
+    # ============================================
+    # 対話表示
+    # ============================================
+    def render(self):
+        os.system('clear' if os.name == 'posix' else 'cls')
+        print("=" * 60)
+        print(f"  {os.path.basename(self.path)}")
+        print("=" * 60)
+        # 末尾表示や遠くの検索結果では索引を作り切らないよう行番号を省略
+        first = self.index.line_of(self.top, max_scan=INDEX_CHUNK * 4)
+        for i, line in enumerate(self.page_lines()):
+            number = f"{first + i + 1:>7}" if first is not None else " " * 7
+            print(f"{number}  {line}")
+        percent = 100 if not self.size else min(self._next_line(self.top) * 100 // self.size, 100)
+        print("-" * 60)
+        print(f"[{percent}%] Enter/j:次 k:前 g<行>:移動 G:末尾 /<文字列>:検索 n:次を検索 q:戻る")
+
+    def run(self):
+        """対話ループ"""
+        while True:
+            self.render()
+            command = input("> ").strip()
+
+            if command in ("", "j"):
+                self.next_page()
+            elif command == "k":
+                self.prev_page()
+            elif command == "G":
+                self.tail()
+            elif command.startswith("g"):
+                try:
+                    self.goto_line(int(command[1:]))
+                except ValueError:
+                    pass
+            elif command.startswith("/") or command == "n":
+                if not self.search(command[1:] if command.startswith("/") else None):
+                    input("見つかりません（Enterキーで続行）")
+            elif command == "q":
+                break
+
+
+def main():
+    parser = argparse.ArgumentParser(description="大容量レポートのページャー")
+    parser.add_argument("path", help="表示するファイル")
+    parser.add_argument("--lines", type=int, help="1ページの行数")
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.path):
+        print(f"❌ ファイルが見つかりません: {args.path}")
+        return 1
+
+    with ReportPager(args.path, args.lines) as pager:
+        pager.run()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
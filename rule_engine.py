@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ワークフロー審査ルールのコンパイル
+config/audit_rules.json のリストを読み込み時に一度だけ集合と複数キーワード照合器
+（Aho-Corasick）に変換し、1件あたりの審査コストがルール数に依存しないようにします。
+コンパイル結果はファイル内容のハッシュごとにディスクへキャッシュし、
+ファイルの変更を監視して実行中のプロセスでも新しいルールに切り替えます
+"""
+
+import os
+import json
+import pickle
+import hashlib
+import tempfile
+import threading
+from collections import deque
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "compiled_rules")
+
+# コンパイル結果の形式が変わったら上げる（古いキャッシュを使わないため）
+COMPILED_FORMAT = 1
+
+# この件数以下のキーワードは `in` で順に調べた方が速い
+LINEAR_SCAN_MAX = 16
+
+class KeywordMatcher:
+    """
+    複数キーワードの部分一致照合（Aho-Corasick）
+
+    リストを先頭から順に `keyword in text` で調べた場合と同じ結果
+    （テキスト中に現れるキーワードのうちリストで最も前にあるもの）を返す
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        """
+        Args:
+            keywords: キーワードのリスト（順序が優先順位）
+        """
+        self.keywords = list(keywords)
+        self._linear = len(self.keywords) <= LINEAR_SCAN_MAX
+        self._goto = [{}]
+        self._fail = [0]
+        self._best = [None]  # 状態ごとに一致するキーワードの最小インデックス
+        self._always = None  # 空文字列のキーワードはどのテキストにも一致する
+
+        for index, keyword in enumerate(self.keywords):
+            if not keyword:
+                if self._always is None:
+                    self._always = index
+                continue
+            state = 0
+            for char in keyword:
+                nxt = self._goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._best.append(None)
+                state = nxt
+            if self._best[state] is None:
+                self._best[state] = index
+
+        # 失敗遷移を幅優先で作り、接尾辞で一致するキーワードを各状態に集約
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                inherited = self._best[self._fail[nxt]]
+                if inherited is not None and (self._best[nxt] is None or inherited < self._best[nxt]):
+                    self._best[nxt] = inherited
+
+    def first_match(self, *texts: str) -> Optional[str]:
+        """
+        いずれかのテキストに含まれるキーワードのうち、リストで最も前にあるもの
+
+        Returns:
+            キーワード（一致しなければNone）
+        """
+        if self._linear:
+            for keyword in self.keywords:
+                for text in texts:
+                    if keyword in text:
+                        return keyword
+            return None
+
+        best = self._always
+        goto, fail, best_at = self._goto, self._fail, self._best
+        for text in texts:
+            state = 0
+            for char in text:
+                while state and char not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(char, 0)
+                found = best_at[state]
+                if found is not None and (best is None or found < best):
+                    best = found
+                    if best == 0:
+                        return self.keywords[0]
+        return None if best is None else self.keywords[best]
+
+
+class CompiledRules:
+    """審査ルールを照合しやすい形に変換したもの（作成後は変更不可）"""
+
+    def __init__(self, rules: Dict, version: str = None):
+        """
+        Args:
+            rules: audit_rules.json の内容
+            version: ルールのバージョン（Noneなら内容から算出）
+        """
+        self.rules = rules
+        self.version = version or rules_version(json.dumps(rules, ensure_ascii=False, sort_keys=True).encode('utf-8'))
+
+        auto_approve = rules['auto_approve']
+        auto_reject = rules['auto_reject']
+        manual = rules['require_manual_review']
+
+        self.known_vendors = frozenset(auto_approve['known_vendors'])
+        self.max_cost_yen = auto_approve['max_cost_yen']
+        self.prohibited_categories = KeywordMatcher(auto_reject['prohibited_categories'])
+        self.high_risk_licenses = frozenset(auto_reject['high_risk_licenses'])
+        self.high_cost_threshold = manual['high_cost_threshold']
+        self.sensitive_departments = frozenset(manual['sensitive_departments'])
+        self.security_keywords = KeywordMatcher(manual['security_keywords'])
+        self._frozen = True
+
+    def __setattr__(self, name, value):
+        if getattr(self, '_frozen', False):
+            raise AttributeError("CompiledRules は変更できません（新しいルールは作り直して差し替える）")
+        super().__setattr__(name, value)
+
+
+# ============================================
+# 読み込みとキャッシュ
+# ============================================
+def rules_version(content: bytes) -> str:
+    """ルールファイルの内容からバージョン（SHA-256の先頭12桁）を求める"""
+    return hashlib.sha256(content).hexdigest()[:12]
+
+def load_compiled_rules(config_path, cache_dir: str = None) -> CompiledRules:
+    """
+    ルールファイルを読み込んでコンパイル（同じ内容のコンパイル結果がキャッシュにあればそれを使う）
+
+    Raises:
+        ValueError: ルールファイルの形式が不正
+    """
+    with open(config_path, 'rb') as f:
+        content = f.read()
+    version = rules_version(content)
+
+    cache_dir = cache_dir or DEFAULT_CACHE_DIR
+    cache_path = os.path.join(cache_dir, f"{version}_v{COMPILED_FORMAT}.pickle")
+    try:
+        with open(cache_path, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        pass
+
+    try:
+        compiled = CompiledRules(json.loads(content.decode('utf-8')), version)
+    except (UnicodeDecodeError, KeyError, TypeError) as e:
+        raise ValueError(f"審査ルールの形式が不正です: {e}") from e
+
+    # 一時ファイルに書いてから置き換え、並行するプロセスに書きかけを読ませない
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        pickle.dump(compiled, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, cache_path)
+    return compiled
+
+
+class RuleWatcher:
+    """ルールファイルの変更を定期的に確認し、変更があれば読み直して通知する"""
+
+    def __init__(self, config_path, on_reload: Callable[[CompiledRules], None], interval: float = 5.0,
+                 cache_dir: str = None):
+        """
+        Args:
+            config_path: 監視するルールファイル
+            on_reload: 新しい CompiledRules を受け取る関数
+            interval: 確認間隔（秒）
+            cache_dir: コンパイル結果のキャッシュディレクトリ（Noneなら cache/compiled_rules）
+        """
+        self.config_path = config_path
+        self.cache_dir = cache_dir
+        self.on_reload = on_reload
+        self.interval = interval
+        self._stop = threading.Event()
+        self._signature = self._stat()
+
+    def _stat(self):
+        try:
+            st = os.stat(self.config_path)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def check(self) -> bool:
+        """
+        変更があれば読み直す
+
+        Returns:
+            新しいルールに切り替えたかどうか
+        """
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return False
+        self._signature = signature
+        try:
+            compiled = load_compiled_rules(self.config_path, self.cache_dir)
+        except ValueError as e:
+            # 編集途中などで読めない場合は現在のルールのまま、次の変更で再度読み込む
+            print(f"[WARNING] 審査ルールを読み込めません（現在のルールを継続）: {e}")
+            return False
+        self.on_reload(compiled)
+        return True
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self):
+        threading.Thread(target=self._loop, name="rule-watcher", daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+
+# ============================================
+# コストの解析
+# ============================================
+def parse_cost(value) -> Tuple[int, bool]:
+    """
+    「コスト」列の値を金額に変換
+
+    Returns:
+        (金額, 解析できなかったか)
+    """
+    try:
+        cost_str = value.replace('円', '').replace(',', '').replace('/', '年').split()[0]
+        return (int(cost_str) if cost_str.isdigit() else 0), False
+    except:
+        return 0, True
@@ -43,7 +43,7 @@ echo "🔍 審査を開始します..."
 echo ""
 
 # 審査実行
-python workflow_audit.py
+python workflow_audit.py --workers "${AUDIT_WORKERS:-1}"
 
 echo ""
 echo "=========================================="
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+検索結果の永続キャッシュ（SQLite）
+TTLによる有効期限と、件数上限を超えた場合のLRU削除に対応
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "search_cache.sqlite3")
+
+class SearchCache:
+    """クエリとパラメータをキーにした検索結果キャッシュ"""
+
+    def __init__(self, path=None, ttl_seconds=7 * 24 * 3600, max_entries=5000):
+        """
+        Args:
+            path: SQLiteファイルのパス
+            ttl_seconds: キャッシュの有効期限（秒）
+            max_entries: 保持する最大件数（超過分は最終参照が古い順に削除）
+        """
+        self.path = path or DEFAULT_CACHE_PATH
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS search_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    params TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_search_cache_access ON search_cache(last_access)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def make_key(params):
+        """正規化したクエリとパラメータからキャッシュキーを生成"""
+        normalized = {
+            "q": re.sub(r"\s+", " ", str(params.get("q", ""))).strip().lower(),
+            "num": str(params.get("num", "")),
+            "hl": str(params.get("hl", "")).lower(),
+            "gl": str(params.get("gl", "")).lower(),
+        }
+        raw = json.dumps(normalized, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest(), normalized
+
+    def get(self, params):
+        """
+        キャッシュを参照
+
+        Returns:
+            (payload, 保存日時のepoch秒) または None
+        """
+        key, _ = self.make_key(params)
+        now = time.time()
+
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT payload, created_at FROM search_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    conn.execute("DELETE FROM search_cache WHERE cache_key = ?", (key,))
+                self.misses += 1
+                return None
+
+            conn.execute("UPDATE search_cache SET last_access = ? WHERE cache_key = ?", (now, key))
+            self.hits += 1
+            return json.loads(row[0]), row[1]
+
+    def put(self, params, payload):
+        """キャッシュに保存し、上限を超えた分をLRUで削除"""
+        key, normalized = self.make_key(params)
+        now = time.time()
+
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO search_cache (cache_key, params, payload, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(normalized, ensure_ascii=False), json.dumps(payload, ensure_ascii=False), now, now)
+            )
+            conn.execute(
+                "DELETE FROM search_cache WHERE cache_key IN ("
+                "  SELECT cache_key FROM search_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?"
+                ")",
+                (self.max_entries,)
+            )
+
+    def stats(self):
+        """ヒット/ミス件数を返す"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0
+        }
@@ -1,10 +1,26 @@
 #!/bin/bash
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 
+# 毎日午前8時30分にJVN iPediaローカルミラーを差分同期
+MIRROR_ENTRY="30 8 * * * cd ${SCRIPT_DIR} && python3 jvn_mirror.py sync >> logs/jvn_mirror_sync.log 2>&1"
+
 # 毎日午前9時に実行
-CRON_ENTRY="0 9 * * * cd ${SCRIPT_DIR} && source .env && ./batch_audit.sh"
+CRON_ENTRY="0 9 * * * cd ${SCRIPT_DIR} && . ./.env && ./batch_audit.sh"
+
+# 起動時に審査待ちフォルダの常駐監視を開始（data/pending/ と exceptions/requests/ を到着次第審査）
+WATCHER_ENTRY="@reboot cd ${SCRIPT_DIR} && . ./.env && python3 pending_watcher.py --workers \${AUDIT_WORKERS:-1} >> logs/pending_watcher.log 2>&1"
 
 # Cronに追加
-(crontab -l 2>/dev/null; echo "${CRON_ENTRY}") | crontab -
+(crontab -l 2>/dev/null; echo "${MIRROR_ENTRY}"; echo "${CRON_ENTRY}"; echo "${WATCHER_ENTRY}") | crontab -
+
+echo "Cron設定完了: 毎日午前8時30分にJVNミラーを同期し、午前9時に自動審査を実行します"
+echo "起動時に pending_watcher.py を常駐させ、審査待ちファイルを到着次第審査します（ログ: logs/pending_watcher.log）"
 
-echo "Cron設定完了: 毎日午前9時に自動審査を実行します"
+# @reboot は次回の起動まで実行されないため、常駐監視が動いていなければ今すぐ開始する
+if pgrep -f "python3 pending_watcher.py" > /dev/null; then
+    echo "pending_watcher.py は既に起動しています"
+else
+    mkdir -p "${SCRIPT_DIR}/logs"
+    (cd "${SCRIPT_DIR}" && { [ -f .env ] && . ./.env; } ; nohup python3 pending_watcher.py --workers "${AUDIT_WORKERS:-1}" >> logs/pending_watcher.log 2>&1 &)
+    echo "pending_watcher.py を起動しました（次回以降は起動時に自動で開始します）"
+fi
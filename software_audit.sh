@@ -63,6 +63,9 @@ echo "==========================================================================
 echo "総合判定: $([ "$OVERALL_PASS" = true ] && echo "✅ 合格" || echo "❌ 不合格")" >> "$REPORT_FILE"
 echo "================================================================================" >> "$REPORT_FILE"
 
+# 審査結果ストアに記録（generate_summary.py はストアを参照）
+python3 audit_store.py import "$REPORT_FILE" > /dev/null || echo "[WARNING] 審査結果ストアへの記録に失敗しました"
+
 echo ""
 echo "=========================================="
 if $OVERALL_PASS; then
@@ -6,8 +6,15 @@
 import os
 import sys
 import json
+import time
+import argparse
+import threading
 from datetime import datetime
 from pathlib import Path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from dir_snapshot import SnapshotCache
+from report_pager import ReportPager
 
 class SoftwareAuditDashboard:
     def __init__(self):
@@ -19,6 +26,8 @@ class SoftwareAuditDashboard:
         self.reports_exception_dir = self.exceptions_dir / "reports"
         self.archive_dir = self.exceptions_dir / "archive"
         self.whitelist_dir = self.base_dir / "whitelist"
+        # ディレクトリごとの走査結果（変更のあったディレクトリだけ再走査）
+        self.snapshots = SnapshotCache()
         
         # ディレクトリ作成
         for d in [self.reports_dir, self.requests_dir, self.approved_dir, 
@@ -27,18 +36,39 @@ class SoftwareAuditDashboard:
     
     def count_files(self, directory):
         """ディレクトリ内のファイル数をカウント"""
-        try:
-            return len(list(directory.glob("*")))
-        except:
-            return 0
+        return self.snapshots.get(directory).count
     
     def get_recent_files(self, directory, limit=5):
         """最近のファイルを取得"""
-        try:
-            files = sorted(directory.glob("*"), key=lambda x: x.stat().st_mtime, reverse=True)
-            return files[:limit]
-        except:
-            return []
+        return self.snapshots.get(directory).recent(limit)
+    
+    def metric_directories(self):
+        """統計の対象ディレクトリ（メトリクスのラベル, 表示名, パス）"""
+        return [
+            ("requests", "申請中", self.requests_dir),
+            ("approved", "承認済み", self.approved_dir),
+            ("exception_reports", "例外レポート", self.reports_exception_dir),
+            ("archive", "アーカイブ", self.archive_dir),
+            ("audit_reports", "全監査レポート", self.reports_dir),
+            ("whitelist", "ホワイトリスト登録", self.whitelist_dir),
+        ]
+    
+    def collect_metrics(self):
+        """ダッシュボードと同じ統計（件数・ディレクトリサイズ）を集計"""
+        directories = {}
+        for label, title, directory in self.metric_directories():
+            snapshot = self.snapshots.get(directory)
+            directories[label] = {
+                'title': title,
+                'path': str(directory),
+                'files': snapshot.count,
+                'bytes': snapshot.total_size,
+            }
+        return {
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'generated_at_unix': time.time(),
+            'directories': directories,
+        }
     
     def display_dashboard(self):
         """ダッシュボードを表示"""
@@ -68,7 +98,7 @@ class SoftwareAuditDashboard:
         approved_files = self.get_recent_files(self.approved_dir, 5)
         if approved_files:
             for i, f in enumerate(approved_files, 1):
-                mtime = datetime.fromtimestamp(f.stat().st_mtime)
+                mtime = datetime.fromtimestamp(f.mtime)
                 print(f"[{i}] {f.name}")
                 print(f"    承認日時: {mtime.strftime('%Y-%m-%d %H:%M:%S')}")
                 print()
@@ -82,8 +112,8 @@ class SoftwareAuditDashboard:
         whitelist_files = self.get_recent_files(self.whitelist_dir, 10)
         if whitelist_files:
             for f in whitelist_files:
-                mtime = datetime.fromtimestamp(f.stat().st_mtime)
-                print(f"  ✓ {f.stem} - 登録日: {mtime.strftime('%Y-%m-%d')}")
+                mtime = datetime.fromtimestamp(f.mtime)
+                print(f"  ✓ {f.path.stem} - 登録日: {mtime.strftime('%Y-%m-%d')}")
         else:
             print("  ホワイトリストは空です")
         print()
@@ -140,7 +170,7 @@ class SoftwareAuditDashboard:
         print("=" * 60)
         print()
         
-        files = sorted(directory.glob("*"), key=lambda x: x.stat().st_mtime, reverse=True)
+        files = self.snapshots.get(directory).entries
         
         if not files:
             print("  レポートはありません")
@@ -148,8 +178,8 @@ class SoftwareAuditDashboard:
             return
         
         for i, f in enumerate(files, 1):
-            mtime = datetime.fromtimestamp(f.stat().st_mtime)
-            size = f.stat().st_size
+            mtime = datetime.fromtimestamp(f.mtime)
+            size = f.size
             print(f"[{i:2}] {f.name}")
             print(f"     更新: {mtime.strftime('%Y-%m-%d %H:%M:%S')} | サイズ: {size:,} bytes")
         
@@ -159,27 +189,18 @@ class SoftwareAuditDashboard:
         try:
             idx = int(choice)
             if 1 <= idx <= len(files):
-                self.show_file_content(files[idx - 1])
+                self.show_file_content(files[idx - 1].path)
         except:
             pass
     
     def show_file_content(self, filepath):
-        """ファイル内容を表示"""
-        os.system('clear' if os.name == 'posix' else 'cls')
-        print("=" * 60)
-        print(f"  {filepath.name}")
-        print("=" * 60)
-        print()
-        
+        """ファイル内容を表示（メモリマップのページャーで全体を読み込まずに表示）"""
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
-                print(content)
+            with ReportPager(filepath) as pager:
+                pager.run()
         except Exception as e:
             print(f"エラー: {e}")
-        
-        print()
-        input("\nEnterキーで戻る...")
+            input("\nEnterキーで戻る...")
     
     def show_audit_logs(self):
         """監査ログを表示"""
@@ -192,16 +213,16 @@ class SoftwareAuditDashboard:
         # すべてのレポートディレクトリから最新10件を取得
         all_files = []
         for d in [self.reports_dir, self.reports_exception_dir, self.approved_dir]:
-            all_files.extend(d.glob("*"))
+            all_files.extend(self.get_recent_files(d, 10))
         
-        recent = sorted(all_files, key=lambda x: x.stat().st_mtime, reverse=True)[:10]
+        recent = sorted(all_files, key=lambda x: x.mtime, reverse=True)[:10]
         
         if not recent:
             print("  ログはありません")
         else:
             for i, f in enumerate(recent, 1):
-                mtime = datetime.fromtimestamp(f.stat().st_mtime)
-                print(f"[{i}] {mtime.strftime('%Y-%m-%d %H:%M:%S')} - {f.parent.name}/{f.name}")
+                mtime = datetime.fromtimestamp(f.mtime)
+                print(f"[{i}] {mtime.strftime('%Y-%m-%d %H:%M:%S')} - {f.path.parent.name}/{f.name}")
         
         print()
         input("\nEnterキーで戻る...")
@@ -227,7 +248,7 @@ class SoftwareAuditDashboard:
             ("承認済み", self.approved_dir),
             ("アーカイブ", self.archive_dir)
         ]:
-            size = sum(f.stat().st_size for f in d.glob("*") if f.is_file())
+            size = self.snapshots.get(d).total_size
             print(f"  {name:20}: {size:10,} bytes")
         
         print()
@@ -266,9 +287,114 @@ class SoftwareAuditDashboard:
                 print("\n無効な選択です")
                 input("\nEnterキーで続行...")
 
+# ============================================
+# メトリクスHTTPエンドポイント（非対話モード）
+# ============================================
+def render_prometheus(metrics):
+    """Prometheusのテキスト形式に変換"""
+    lines = [
+        "# HELP software_audit_files ディレクトリ内のファイル数",
+        "# TYPE software_audit_files gauge",
+    ]
+    for label, values in metrics['directories'].items():
+        lines.append(f'software_audit_files{{directory="{label}"}} {values["files"]}')
+    lines += [
+        "# HELP software_audit_directory_bytes ディレクトリ内のファイルの合計サイズ",
+        "# TYPE software_audit_directory_bytes gauge",
+    ]
+    for label, values in metrics['directories'].items():
+        lines.append(f'software_audit_directory_bytes{{directory="{label}"}} {values["bytes"]}')
+    lines += [
+        "# HELP software_audit_metrics_generated_timestamp_seconds 統計を集計した時刻",
+        "# TYPE software_audit_metrics_generated_timestamp_seconds gauge",
+        f"software_audit_metrics_generated_timestamp_seconds {metrics['generated_at_unix']:.3f}",
+    ]
+    return "\n".join(lines) + "\n"
+
+class MetricsPublisher:
+    """統計をバックグラウンドで定期的に集計し、応答本文をメモリ上に保持する"""
+
+    def __init__(self, dashboard, interval=30):
+        """
+        Args:
+            dashboard: SoftwareAuditDashboard
+            interval: 再集計の間隔（秒）
+        """
+        self.dashboard = dashboard
+        self.interval = interval
+        self._stop = threading.Event()
+        self.bodies = {}
+        self.refresh()
+
+    def refresh(self):
+        metrics = self.dashboard.collect_metrics()
+        # 参照の差し替えだけで公開するため、応答側はロック不要
+        self.bodies = {
+            '/metrics': (render_prometheus(metrics).encode('utf-8'), 'text/plain; version=0.0.4; charset=utf-8'),
+            '/metrics.json': (json.dumps(metrics, ensure_ascii=False, indent=2).encode('utf-8'),
+                              'application/json; charset=utf-8'),
+        }
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"[WARNING] 統計の集計に失敗: {e}")
+
+    def start(self):
+        threading.Thread(target=self._loop, name="metrics-refresh", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+def make_handler(publisher):
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = publisher.bodies.get(self.path.split('?', 1)[0])
+            if body is None:
+                self.send_error(404)
+                return
+            content, content_type = body
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, format, *args):
+            pass  # スクレイプごとのアクセスログは出さない
+
+    return MetricsHandler
+
+def serve_metrics(dashboard, host, port, interval):
+    """/metrics（Prometheus）と /metrics.json を提供"""
+    publisher = MetricsPublisher(dashboard, interval)
+    publisher.start()
+    server = ThreadingHTTPServer((host, port), make_handler(publisher))
+    print(f"[INFO] メトリクスを提供中: http://{host}:{port}/metrics , /metrics.json（{interval}秒ごとに再集計）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n終了します")
+    finally:
+        publisher.stop()
+        server.server_close()
+
 def main():
+    parser = argparse.ArgumentParser(description="ソフトウェア監査システム ダッシュボード")
+    parser.add_argument("--serve", action="store_true", help="対話画面の代わりにメトリクスHTTPエンドポイントを起動")
+    parser.add_argument("--host", default="127.0.0.1", help="待ち受けアドレス（デフォルト: 127.0.0.1）")
+    parser.add_argument("--port", type=int, default=int(os.environ.get('DASHBOARD_METRICS_PORT', '9108')),
+                        help="待ち受けポート（デフォルト: 9108）")
+    parser.add_argument("--interval", type=int, default=30, help="再集計の間隔（秒、デフォルト: 30）")
+    args = parser.parse_args()
+
     dashboard = SoftwareAuditDashboard()
-    dashboard.run()
+    if args.serve:
+        serve_metrics(dashboard, args.host, args.port, args.interval)
+    else:
+        dashboard.run()
 
 if __name__ == "__main__":
     main()
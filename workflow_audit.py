@@ -4,38 +4,371 @@
 """
 
 import csv
+import html
+import io
 import os
 import sys
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
 from datetime import datetime
 from pathlib import Path
 import json
-from typing import Dict, List, Tuple
+from typing import IO, Dict, Iterator, List, Tuple
 import shutil
+import tempfile
+
+from rule_engine import CompiledRules, RuleWatcher, load_compiled_rules, parse_cost
+from decision_cache import DecisionCache
+
+DECISIONS = ('approved', 'rejected', 'manual_review')
+
+DECISION_LABELS = {
+    'approved': '✅ 承認',
+    'rejected': '❌ 却下',
+    'manual_review': '⚠️ 要手動審査'
+}
+
+def open_exclusive(path: Path, mode: str = 'x', **kwargs) -> Tuple[IO, Path]:
+    """
+    ファイルを排他的に新規作成する（同名ファイルがあれば _2, _3 ... を付ける）
+    
+    同じ秒に完了した並列処理同士でも出力ファイルが上書きされないようにする
+    
+    Returns:
+        (ファイルオブジェクト, 作成したパス)
+    """
+    candidate = path
+    n = 1
+    while True:
+        try:
+            return open(candidate, mode, **kwargs), candidate
+        except FileExistsError:
+            n += 1
+            candidate = path.with_name(f'{path.stem}_{n}{path.suffix}')
+
+class DecisionCSVWriter:
+    """判定ごとのCSVファイルへ1行ずつ書き出す（判定ごとに最初の行でファイルを作成）"""
+    
+    def __init__(self, output_dirs: Dict[str, Path], base_name: str, timestamp: str):
+        """
+        Args:
+            output_dirs: 判定ごとの出力ディレクトリ
+            base_name: 元のCSVファイル名（拡張子なし）
+            timestamp: ファイル名に付けるタイムスタンプ
+        """
+        self.output_dirs = output_dirs
+        self.base_name = base_name
+        self.timestamp = timestamp
+        self.counts = {decision: 0 for decision in output_dirs}
+        self.paths = {}
+        self._files = {}
+        self._writers = {}
+    
+    def output_path(self, decision: str) -> Path:
+        return self.output_dirs[decision] / f'{self.base_name}_{decision}_{self.timestamp}.csv'
+    
+    def write(self, decision: str, app: Dict):
+        writer = self._writers.get(decision)
+        if writer is None:
+            f, self.paths[decision] = open_exclusive(self.output_path(decision), encoding='utf-8', newline='')
+            writer = csv.DictWriter(f, fieldnames=list(app.keys()))
+            writer.writeheader()
+            self._files[decision] = f
+            self._writers[decision] = writer
+        writer.writerow(app)
+        self.counts[decision] += 1
+    
+    def close(self) -> Dict[str, int]:
+        """
+        ファイルを閉じて結果を表示
+        
+        Returns:
+            判定ごとの件数
+        """
+        for decision, f in self._files.items():
+            f.close()
+        for decision in self.output_dirs:
+            if decision in self._files:
+                print(f"✅ {decision}: {self.counts[decision]}件 → {self.paths[decision]}")
+        self._files.clear()
+        self._writers.clear()
+        return self.counts
+    
+    def discard(self):
+        """書き出しを中止し、作成途中のファイルを削除"""
+        for decision, f in self._files.items():
+            f.close()
+            self.paths[decision].unlink(missing_ok=True)
+        self._files.clear()
+        self._writers.clear()
+        self.paths.clear()
+
+REPORT_STYLE = """    <style>
+        body { font-family: 'Segoe UI', Meiryo, sans-serif; margin: 20px; }
+        h1 { color: #2c3e50; }
+        .summary { background: #ecf0f1; padding: 15px; border-radius: 5px; margin: 20px 0; }
+        .summary-item { display: inline-block; margin: 10px 20px; }
+        .approved { color: #27ae60; font-weight: bold; }
+        .rejected { color: #e74c3c; font-weight: bold; }
+        .manual { color: #f39c12; font-weight: bold; }
+        table { border-collapse: collapse; width: 100%; margin: 20px 0; }
+        th, td { border: 1px solid #ddd; padding: 12px; text-align: left; }
+        th { background: #34495e; color: white; }
+        tr:nth-child(even) { background: #f2f2f2; }
+        .section { margin: 30px 0; }
+    </style>
+"""
+
+REPORT_COLUMNS = ['申請ID', '申請者', '部署', 'ソフトウェア名', 'ベンダー', 'コスト', '審査理由']
+
+TABLE_HEADER = """        <table>
+            <tr>
+""" + "".join(f"                <th>{column}</th>\n" for column in REPORT_COLUMNS) + """            </tr>
+"""
+
+class HTMLReportWriter:
+    """
+    審査レポート（HTML）を1行ずつ書き出す（値はHTMLエスケープする）
+    
+    概要の件数はすべての行を処理するまで確定しないため、通常は判定ごとの表の行を
+    一時ファイルに書き溜め、close() で見出しと連結してレポートを作成する。
+    page_size を指定すると、各判定の行を page_size 件ごとのページファイルへ直接書き出し、
+    レポート本体には概要と各ページへのリンクだけを載せる
+    """
+    
+    def __init__(self, report_path: Path, original_filename: str, page_size: int = 0):
+        """
+        Args:
+            report_path: 出力するHTMLファイルのパス（同名があれば _2 などを付ける）
+            original_filename: 元のCSVファイル名
+            page_size: 1ページの行数（0ならページ分割しない）
+        """
+        self._file, self.report_path = open_exclusive(report_path, encoding='utf-8')
+        self.original_filename = original_filename
+        self.page_size = page_size
+        self.counts = {decision: 0 for decision in DECISIONS}
+        self._spools = {}
+        self._pages = {decision: [] for decision in DECISIONS}
+    
+    @staticmethod
+    def _row(app: Dict) -> str:
+        cells = "".join(
+            f"                <td>{html.escape(str(app.get(column, '')))}</td>\n" for column in REPORT_COLUMNS
+        )
+        return f"""
+            <tr>
+{cells}            </tr>
+"""
+    
+    def add(self, decision: str, app: Dict):
+        if self.page_size:
+            out = self._page_for(decision)
+        else:
+            out = self._spools.get(decision)
+            if out is None:
+                out = self._spools[decision] = tempfile.TemporaryFile('w+', encoding='utf-8')
+        out.write(self._row(app))
+        self.counts[decision] += 1
+    
+    # ============================================
+    # ページ分割
+    # ============================================
+    def _page_name(self, decision: str, number: int) -> str:
+        return f"{self.report_path.stem}_{decision}_p{number}.html"
+    
+    def _page_for(self, decision: str) -> IO:
+        """行を書き込むページファイル（満杯なら次のページを開く）"""
+        pages = self._pages[decision]
+        if pages and self.counts[decision] % self.page_size:
+            return pages[-1]
+        if pages:
+            self._finish_page(decision, has_next=True)
+        number = len(pages) + 1
+        page = open(self.report_path.with_name(self._page_name(decision, number)), 'w', encoding='utf-8')
+        page.write(f"""<!DOCTYPE html>
+<html lang="ja">
+<head>
+    <meta charset="UTF-8">
+    <title>{DECISION_LABELS[decision]} {number}ページ目 - ソフトウェア申請審査レポート</title>
+{REPORT_STYLE}</head>
+<body>
+    <h1>{DECISION_LABELS[decision]} {number}ページ目</h1>
+    <p>対象ファイル: {html.escape(self.original_filename)} | <a href="{html.escape(self.report_path.name)}">レポートに戻る</a></p>
+    <div class="section">
+{TABLE_HEADER}""")
+        pages.append(page)
+        return page
+    
+    def _finish_page(self, decision: str, has_next: bool):
+        pages = self._pages[decision]
+        page, number = pages[-1], len(pages)
+        links = []
+        if number > 1:
+            links.append(f'<a href="{html.escape(self._page_name(decision, number - 1))}">← 前のページ</a>')
+        links.append(f'<a href="{html.escape(self.report_path.name)}">レポートに戻る</a>')
+        if has_next:
+            links.append(f'<a href="{html.escape(self._page_name(decision, number + 1))}">次のページ →</a>')
+        page.write(f"""
+        </table>
+    </div>
+    <p>{' | '.join(links)}</p>
+</body>
+</html>
+""")
+        page.close()
+        # 書き終えたページは名前だけ残す
+        pages[-1] = None
+    
+    # ============================================
+    # 書き出し
+    # ============================================
+    def _header(self) -> str:
+        total = sum(self.counts.values())
+        return f"""<!DOCTYPE html>
+<html lang="ja">
+<head>
+    <meta charset="UTF-8">
+    <title>ソフトウェア申請審査レポート</title>
+{REPORT_STYLE}</head>
+<body>
+    <h1>📋 ソフトウェア申請審査レポート</h1>
+    <p>審査日時: {datetime.now().strftime('%Y年%m月%d日 %H:%M:%S')}</p>
+    <p>対象ファイル: {html.escape(self.original_filename)}</p>
+    
+    <div class="summary">
+        <h2>概要</h2>
+        <div class="summary-item">総申請数: <strong>{total}</strong></div>
+        <div class="summary-item approved">承認: {self.counts['approved']}</div>
+        <div class="summary-item rejected">却下: {self.counts['rejected']}</div>
+        <div class="summary-item manual">要手動審査: {self.counts['manual_review']}</div>
+    </div>
+"""
+    
+    def _write_page_links(self, f: IO, decision: str):
+        count = self.counts[decision]
+        f.write(f"""
+    <div class="section">
+        <h2>{DECISION_LABELS[decision]} ({count}件)</h2>
+        <ul>
+""")
+        for number in range(1, len(self._pages[decision]) + 1):
+            first = (number - 1) * self.page_size + 1
+            last = min(number * self.page_size, count)
+            f.write(f'            <li><a href="{html.escape(self._page_name(decision, number))}">'
+                    f'{number}ページ目 ({first}〜{last}件)</a></li>\n')
+        f.write("""        </ul>
+    </div>
+""")
+    
+    def discard(self):
+        """書き出しを中止し、一時ファイルと作成途中のファイルを破棄"""
+        for spool in self._spools.values():
+            spool.close()
+        self._spools.clear()
+        for decision, pages in self._pages.items():
+            if pages and pages[-1] is not None:
+                pages[-1].close()
+            for number in range(1, len(pages) + 1):
+                self.report_path.with_name(self._page_name(decision, number)).unlink(missing_ok=True)
+            pages.clear()
+        if not self._file.closed:
+            self._file.close()
+            self.report_path.unlink(missing_ok=True)
+    
+    def close(self) -> str:
+        """レポートを書き出してパスを返す"""
+        with self._file as f:
+            f.write(self._header())
+            
+            for decision in DECISIONS:
+                if not self.counts[decision]:
+                    continue
+                
+                if self.page_size:
+                    self._finish_page(decision, has_next=False)
+                    self._write_page_links(f, decision)
+                    continue
+                
+                f.write(f"""
+    <div class="section">
+        <h2>{DECISION_LABELS[decision]} ({self.counts[decision]}件)</h2>
+{TABLE_HEADER}""")
+                spool = self._spools.pop(decision)
+                with spool:
+                    spool.seek(0)
+                    shutil.copyfileobj(spool, f)
+                f.write("""
+        </table>
+    </div>
+""")
+            
+            f.write("""
+</body>
+</html>
+""")
+        
+        print(f"\n📊 レポート生成: {self.report_path}")
+        return str(self.report_path)
 
 class WorkflowAuditor:
     """ワークフロー申請の審査を行うクラス"""
     
-    def __init__(self, config_path: str = "config/audit_rules.json"):
+    def __init__(self, config_path: str = "config/audit_rules.json", report_page_size: int = 0,
+                 decision_cache: bool = False, rules_cache_dir: str = None):
         """
         初期化
         
         Args:
             config_path: 審査ルール設定ファイルのパス
+            report_page_size: HTMLレポートの1ページの行数（0ならページ分割しない）
+            decision_cache: 判定キャッシュを使う（同じ内容の申請は前回の判定を再利用）
+            rules_cache_dir: ルールのコンパイル結果のキャッシュディレクトリ（Noneなら cache/compiled_rules）
         """
+        self.report_page_size = report_page_size
+        self.decision_cache = DecisionCache() if decision_cache else None
+        self.last_cache_stats = None  # 直近のファイルの (ヒット数, ミス数)
         self.pending_dir = Path("data/pending")
         self.approved_dir = Path("data/approved")
         self.rejected_dir = Path("data/rejected")
+        self.manual_review_dir = Path("data/manual_review")
         self.archive_dir = Path("data/archive")
         self.reports_dir = Path("reports")
         
         # ディレクトリ作成
-        for dir_path in [self.pending_dir, self.approved_dir, 
-                         self.rejected_dir, self.archive_dir, self.reports_dir]:
+        for dir_path in [self.pending_dir, self.approved_dir, self.rejected_dir,
+                         self.manual_review_dir, self.archive_dir, self.reports_dir]:
             dir_path.mkdir(parents=True, exist_ok=True)
         
-        # 審査ルールの読み込み
+        # 審査ルールの読み込み（ファイルがなければデフォルトルールを保存）
         self.config_path = Path(config_path)
-        self.rules = self._load_rules()
+        if not self.config_path.exists():
+            self._load_rules()
+        # 照合用に集合と複数キーワード照合器へ変換したもの（内容のハッシュでキャッシュ）
+        self.rules_cache_dir = rules_cache_dir
+        self.compiled_rules = load_compiled_rules(self.config_path, rules_cache_dir)
+        self._rule_watcher = None
+    
+    @property
+    def rules(self) -> Dict:
+        """現在の審査ルール（audit_rules.json の内容）"""
+        return self.compiled_rules.rules
+    
+    def watch_rules(self, interval: float = 5.0):
+        """
+        ルールファイルの変更を監視し、変更されたら新しいルールに差し替える
+        
+        審査中の行は開始時点のルールで最後まで審査され、次の行から新しいルールが使われる
+        """
+        if self._rule_watcher is None:
+            self._rule_watcher = RuleWatcher(self.config_path, self._swap_rules, interval,
+                                             self.rules_cache_dir).start()
+        return self._rule_watcher
+    
+    def _swap_rules(self, compiled: CompiledRules):
+        previous = self.compiled_rules.version
+        self.compiled_rules = compiled
+        print(f"[INFO] 審査ルールを再読み込みしました: {previous} → {compiled.version}")
     
     def _load_rules(self) -> Dict:
         """審査ルールを読み込む"""
@@ -71,34 +404,35 @@ class WorkflowAuditor:
             
             return default_rules
     
-    def load_csv(self, csv_path: Path) -> List[Dict]:
-        """CSVファイルを読み込む"""
-        applications = []
-        
+    def iter_csv(self, csv_path: Path) -> Iterator[Dict]:
+        """CSVファイルを1行ずつ読み込む"""
         with open(csv_path, 'r', encoding='utf-8') as f:
             reader = csv.DictReader(f)
             for row in reader:
-                applications.append(row)
-        
-        return applications
+                yield row
+    
+    def load_csv(self, csv_path: Path) -> List[Dict]:
+        """CSVファイルを読み込む"""
+        return list(self.iter_csv(csv_path))
     
-    def audit_application(self, app: Dict) -> Tuple[str, str, List[str]]:
+    def audit_application(self, app: Dict, rules: CompiledRules = None) -> Tuple[str, str, List[str]]:
         """
         個別の申請を審査
         
+        Args:
+            rules: 使用するルール（Noneなら現在のルール）
+        
         Returns:
             (判定, 理由, フラグリスト)
             判定: 'approved', 'rejected', 'manual_review'
         """
+        rules = rules or self.compiled_rules
         flags = []
         reasons = []
         
         # コスト抽出
-        try:
-            cost_str = app.get('コスト', '0円').replace('円', '').replace(',', '').replace('/', '年').split()[0]
-            cost = int(cost_str) if cost_str.isdigit() else 0
-        except:
-            cost = 0
+        cost, cost_unknown = parse_cost(app.get('コスト', '0円'))
+        if cost_unknown:
             flags.append('コスト不明')
         
         # 1. 自動承認チェック
@@ -106,186 +440,237 @@ class WorkflowAuditor:
         license_type = app.get('ライセンス形態', '')
         
         if cost == 0 and '無料' in license_type:
-            if vendor in self.rules['auto_approve']['known_vendors']:
+            if vendor in rules.known_vendors:
                 return 'approved', '信頼できるベンダーの無料ソフトウェア', flags
         
-        if cost <= self.rules['auto_approve']['max_cost_yen']:
+        if cost <= rules.max_cost_yen:
             reasons.append(f'低コスト({cost}円)')
             flags.append('自動承認候補')
         
         # 2. 自動却下チェック
         purpose = app.get('利用目的', '')
-        for prohibited in self.rules['auto_reject']['prohibited_categories']:
-            if prohibited in purpose or prohibited in app.get('ソフトウェア名', ''):
-                return 'rejected', f'禁止カテゴリ: {prohibited}', flags
+        prohibited = rules.prohibited_categories.first_match(purpose, app.get('ソフトウェア名', ''))
+        if prohibited is not None:
+            return 'rejected', f'禁止カテゴリ: {prohibited}', flags
         
-        if license_type in self.rules['auto_reject']['high_risk_licenses']:
+        if license_type in rules.high_risk_licenses:
             return 'rejected', f'高リスクライセンス: {license_type}', flags
         
         # 3. 手動レビュー必要チェック
         department = app.get('部署', '')
         
-        if cost > self.rules['require_manual_review']['high_cost_threshold']:
+        if cost > rules.high_cost_threshold:
             reasons.append(f'高額({cost}円)')
             return 'manual_review', '高額のため手動審査が必要', reasons
         
-        if department in self.rules['require_manual_review']['sensitive_departments']:
+        if department in rules.sensitive_departments:
             reasons.append(f'機密部署: {department}')
             return 'manual_review', '機密部署のため手動審査が必要', reasons
         
-        for keyword in self.rules['require_manual_review']['security_keywords']:
-            if keyword in purpose or keyword in app.get('備考', ''):
-                reasons.append(f'セキュリティキーワード: {keyword}')
-                return 'manual_review', 'セキュリティ要件のため手動審査が必要', reasons
+        keyword = rules.security_keywords.first_match(purpose, app.get('備考', ''))
+        if keyword is not None:
+            reasons.append(f'セキュリティキーワード: {keyword}')
+            return 'manual_review', 'セキュリティ要件のため手動審査が必要', reasons
         
         # デフォルトは承認
         return 'approved', '基準を満たしている', flags
     
+    def audit_cached(self, app: Dict, rules: CompiledRules) -> Tuple[str, str, List[str]]:
+        """判定キャッシュを引き、なければ審査して記録する"""
+        if self.decision_cache is None:
+            return self.audit_application(app, rules)
+        key = self.decision_cache.make_key(app, rules)
+        audited = self.decision_cache.get(key)
+        if audited is None:
+            audited = self.audit_application(app, rules)
+            self.decision_cache.put(key, audited)
+        return audited
+    
+    def decide(self, app: Dict) -> str:
+        """申請を審査し、審査結果の列を追加して判定を返す"""
+        rules = self.compiled_rules
+        decision, reason, flags = self.audit_cached(app, rules)
+        
+        app['審査結果'] = decision
+        app['審査理由'] = reason
+        app['フラグ'] = ', '.join(flags) if flags else 'なし'
+        app['審査日時'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        app['ルールバージョン'] = rules.version
+        
+        return decision
+    
     def process_csv(self, csv_path: Path) -> Dict:
         """CSVファイル全体を処理"""
-        applications = self.load_csv(csv_path)
+        results = {decision: [] for decision in DECISIONS}
         
-        results = {
-            'approved': [],
-            'rejected': [],
-            'manual_review': []
-        }
-        
-        for app in applications:
-            decision, reason, flags = self.audit_application(app)
-            
-            app['審査結果'] = decision
-            app['審査理由'] = reason
-            app['フラグ'] = ', '.join(flags) if flags else 'なし'
-            app['審査日時'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            
-            results[decision].append(app)
+        for app in self.iter_csv(csv_path):
+            results[self.decide(app)].append(app)
         
         return results
     
+    def process_csv_stream(self, csv_path: Path) -> Tuple[Dict[str, int], str]:
+        """
+        CSVファイルを1行ずつ審査し、判定別CSVとHTMLレポートへ逐次書き出す
+        （メモリ使用量は入力件数によらず一定）
+        
+        Returns:
+            (判定ごとの件数, レポートのパス)
+        """
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        csv_writer = DecisionCSVWriter(self._output_dirs(), Path(csv_path).stem, timestamp)
+        report_writer = HTMLReportWriter(self._report_path(csv_path.name, timestamp), csv_path.name,
+                                         self.report_page_size)
+        
+        try:
+            for app in self.iter_csv(csv_path):
+                decision = self.decide(app)
+                csv_writer.write(decision, app)
+                report_writer.add(decision, app)
+        except BaseException:
+            # 途中までの結果は残さない（入力は pending に残るため、再処理で同じ行が重複する）
+            csv_writer.discard()
+            report_writer.discard()
+            raise
+        finally:
+            self._finish_decision_cache()
+        
+        counts = csv_writer.close()
+        return counts, report_writer.close()
+    
+    def _finish_decision_cache(self):
+        """判定キャッシュの新しい記録を保存し、このファイルのヒット率を表示"""
+        if self.decision_cache is None:
+            return
+        self.decision_cache.flush()
+        hits, misses = self.last_cache_stats = self.decision_cache.take_stats()
+        if hits + misses:
+            print(f"🧠 判定キャッシュ: ヒット {hits}/{hits + misses}件 ({hits * 100 / (hits + misses):.1f}%)")
+    
+    def _output_dirs(self) -> Dict[str, Path]:
+        return {decision: getattr(self, f'{decision}_dir') for decision in DECISIONS}
+    
+    def _report_path(self, original_filename: str, timestamp: str) -> Path:
+        return self.reports_dir / f'audit_report_{Path(original_filename).stem}_{timestamp}.html'
+    
     def save_results(self, results: Dict, original_filename: str):
         """審査結果を保存"""
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        base_name = Path(original_filename).stem
+        writer = DecisionCSVWriter(self._output_dirs(), Path(original_filename).stem, timestamp)
         
         for decision, apps in results.items():
-            if not apps:
-                continue
-            
-            output_dir = getattr(self, f'{decision}_dir')
-            output_path = output_dir / f'{base_name}_{decision}_{timestamp}.csv'
-            
-            # CSV出力
-            if apps:
-                fieldnames = list(apps[0].keys())
-                with open(output_path, 'w', encoding='utf-8', newline='') as f:
-                    writer = csv.DictWriter(f, fieldnames=fieldnames)
-                    writer.writeheader()
-                    writer.writerows(apps)
-                
-                print(f"✅ {decision}: {len(apps)}件 → {output_path}")
+            for app in apps:
+                writer.write(decision, app)
+        
+        writer.close()
     
     def generate_report(self, results: Dict, original_filename: str) -> str:
         """審査レポートを生成"""
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        base_name = Path(original_filename).stem
-        report_path = self.reports_dir / f'audit_report_{base_name}_{timestamp}.html'
+        writer = HTMLReportWriter(self._report_path(original_filename, timestamp), original_filename,
+                                  self.report_page_size)
         
-        total = sum(len(apps) for apps in results.values())
+        for decision in DECISIONS:
+            for app in results[decision]:
+                writer.add(decision, app)
         
-        html = f"""<!DOCTYPE html>
-<html lang="ja">
-<head>
-    <meta charset="UTF-8">
-    <title>ソフトウェア申請審査レポート</title>
-    <style>
-        body {{ font-family: 'Segoe UI', Meiryo, sans-serif; margin: 20px; }}
-        h1 {{ color: #2c3e50; }}
-        .summary {{ background: #ecf0f1; padding: 15px; border-radius: 5px; margin: 20px 0; }}
-        .summary-item {{ display: inline-block; margin: 10px 20px; }}
-        .approved {{ color: #27ae60; font-weight: bold; }}
-        .rejected {{ color: #e74c3c; font-weight: bold; }}
-        .manual {{ color: #f39c12; font-weight: bold; }}
-        table {{ border-collapse: collapse; width: 100%; margin: 20px 0; }}
-        th, td {{ border: 1px solid #ddd; padding: 12px; text-align: left; }}
-        th {{ background: #34495e; color: white; }}
-        tr:nth-child(even) {{ background: #f2f2f2; }}
-        .section {{ margin: 30px 0; }}
-    </style>
-</head>
-<body>
-    <h1>📋 ソフトウェア申請審査レポート</h1>
-    <p>審査日時: {datetime.now().strftime('%Y年%m月%d日 %H:%M:%S')}</p>
-    <p>対象ファイル: {original_filename}</p>
+        return writer.close()
     
-    <div class="summary">
-        <h2>概要</h2>
-        <div class="summary-item">総申請数: <strong>{total}</strong></div>
-        <div class="summary-item approved">承認: {len(results['approved'])}</div>
-        <div class="summary-item rejected">却下: {len(results['rejected'])}</div>
-        <div class="summary-item manual">要手動審査: {len(results['manual_review'])}</div>
-    </div>
-"""
-        
-        for decision in ['approved', 'rejected', 'manual_review']:
-            apps = results[decision]
-            if not apps:
-                continue
-            
-            decision_label = {
-                'approved': '✅ 承認',
-                'rejected': '❌ 却下',
-                'manual_review': '⚠️ 要手動審査'
-            }[decision]
-            
-            html += f"""
-    <div class="section">
-        <h2>{decision_label} ({len(apps)}件)</h2>
-        <table>
-            <tr>
-                <th>申請ID</th>
-                <th>申請者</th>
-                <th>部署</th>
-                <th>ソフトウェア名</th>
-                <th>ベンダー</th>
-                <th>コスト</th>
-                <th>審査理由</th>
-            </tr>
-"""
-            
-            for app in apps:
-                html += f"""
-            <tr>
-                <td>{app.get('申請ID', '')}</td>
-                <td>{app.get('申請者', '')}</td>
-                <td>{app.get('部署', '')}</td>
-                <td>{app.get('ソフトウェア名', '')}</td>
-                <td>{app.get('ベンダー', '')}</td>
-                <td>{app.get('コスト', '')}</td>
-                <td>{app.get('審査理由', '')}</td>
-            </tr>
-"""
-            
-            html += """
-        </table>
-    </div>
-"""
-        
-        html += """
-</body>
-</html>
-"""
+    def archive(self, csv_path: Path) -> Path:
+        """処理済みファイルをアーカイブへ移動（同名を避けて確保したパスへ os.replace で一括移動）"""
+        target = self.archive_dir / f"{csv_path.stem}_processed_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        placeholder, archive_path = open_exclusive(target)
+        placeholder.close()
+        os.replace(csv_path, archive_path)
+        return archive_path
+
+
+# ============================================
+# ファイル単位の処理
+# ============================================
+def process_pending_file(auditor: WorkflowAuditor, csv_file: Path) -> Dict:
+    """
+    1ファイルを審査・保存・レポート生成・アーカイブする（エラーはファイル単位で捕捉）
+    
+    Returns:
+        {'file', 'counts', 'report_path', 'archive_path', 'error', 'cache_stats'}
+    """
+    result = {'file': csv_file.name, 'counts': None, 'report_path': None,
+              'archive_path': None, 'error': None, 'cache_stats': None}
+    
+    print(f"\n{'='*60}")
+    print(f"📂 処理中: {csv_file.name}")
+    print(f"{'='*60}")
+    
+    try:
+        # 審査実行（結果のCSVとレポートへ1行ずつ書き出す）
+        result['counts'], result['report_path'] = auditor.process_csv_stream(csv_file)
+        result['cache_stats'] = auditor.last_cache_stats
         
-        with open(report_path, 'w', encoding='utf-8') as f:
-            f.write(html)
+        # 処理済みファイルをアーカイブ
+        result['archive_path'] = str(auditor.archive(csv_file))
+        print(f"📦 アーカイブ: {result['archive_path']}")
         
-        print(f"\n📊 レポート生成: {report_path}")
-        return str(report_path)
+    except Exception as e:
+        print(f"❌ エラー: {csv_file.name} - {str(e)}")
+        result['error'] = str(e)
+    
+    return result
+
+_worker_auditor = None
+
+def _init_worker(report_page_size: int, decision_cache: bool):
+    global _worker_auditor
+    _worker_auditor = WorkflowAuditor(report_page_size=report_page_size, decision_cache=decision_cache)
+
+def _process_in_worker(csv_file: str) -> Tuple[Dict, str]:
+    """ワーカープロセスで1ファイルを処理し、(結果, 出力) を返す"""
+    buffer = io.StringIO()
+    with redirect_stdout(buffer):
+        result = process_pending_file(_worker_auditor, Path(csv_file))
+    return result, buffer.getvalue()
+
+def process_pending_files(auditor: WorkflowAuditor, csv_files: List[Path], workers: int = 1) -> List[Dict]:
+    """
+    複数ファイルを処理（workers > 1 ならプロセスプールで並列に処理）
+    
+    並列時は各ファイルの出力をまとめて、完了した順に表示する
+    """
+    if workers <= 1 or len(csv_files) <= 1:
+        return [process_pending_file(auditor, csv_file) for csv_file in csv_files]
+    
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(auditor.report_page_size, auditor.decision_cache is not None)) as pool:
+        futures = {pool.submit(_process_in_worker, str(csv_file)): csv_file for csv_file in csv_files}
+        for future in as_completed(futures):
+            csv_file = futures[future]
+            try:
+                result, output = future.result()
+            except Exception as e:
+                # ワーカープロセス自体の異常終了もファイル単位のエラーとして扱う
+                output = f"\n❌ エラー: {csv_file.name} - {str(e)}\n"
+                result = {'file': csv_file.name, 'counts': None, 'report_path': None,
+                          'archive_path': None, 'error': str(e), 'cache_stats': None}
+            print(output, end='')
+            results.append(result)
+    return results
 
 
 def main():
     """メイン処理"""
-    auditor = WorkflowAuditor()
+    parser = argparse.ArgumentParser(description="ワークフロー申請ソフトウェア審査")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="並列に処理するCSVファイル数（デフォルト: 1）")
+    parser.add_argument("--report-page-size", type=int,
+                        default=int(os.environ.get('WORKFLOW_REPORT_PAGE_SIZE', '0')),
+                        help="HTMLレポートを判定ごとにこの行数でページ分割（デフォルト: 0 = 分割しない）")
+    parser.add_argument("--no-decision-cache", action="store_true",
+                        default=os.environ.get('WORKFLOW_DECISION_CACHE', '1') == '0',
+                        help="判定キャッシュ（cache/decision_cache.sqlite3）を使わない")
+    args = parser.parse_args()
+    
+    auditor = WorkflowAuditor(report_page_size=args.report_page_size,
+                              decision_cache=not args.no_decision_cache)
     
     # pendingディレクトリ内のCSVファイルを処理
     csv_files = list(auditor.pending_dir.glob('*.csv'))
@@ -300,40 +685,33 @@ def main():
     
     print(f"🔍 {len(csv_files)}個のCSVファイルを検出\n")
     
+    targets = []
     for csv_file in csv_files:
         if csv_file.name == 'sample.csv':
             print(f"⏭️  スキップ: {csv_file.name} (サンプルファイル)")
             continue
-        
-        print(f"\n{'='*60}")
-        print(f"📂 処理中: {csv_file.name}")
-        print(f"{'='*60}")
-        
-        try:
-            # 審査実行
-            results = auditor.process_csv(csv_file)
-            
-            # 結果保存
-            auditor.save_results(results, csv_file.name)
-            
-            # レポート生成
-            report_path = auditor.generate_report(results, csv_file.name)
-            
-            # 処理済みファイルをアーカイブ
-            archive_path = auditor.archive_dir / f"{csv_file.stem}_processed_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-            shutil.move(str(csv_file), str(archive_path))
-            print(f"📦 アーカイブ: {archive_path}")
-            
-        except Exception as e:
-            print(f"❌ エラー: {csv_file.name} - {str(e)}")
-            continue
+        targets.append(csv_file)
+    
+    results = process_pending_files(auditor, targets, args.workers)
     
     print(f"\n{'='*60}")
     print("✅ すべての処理が完了しました")
+    if len(results) > 1:
+        totals = {decision: 0 for decision in DECISIONS}
+        for result in results:
+            for decision, count in (result['counts'] or {}).items():
+                totals[decision] += count
+        errors = sum(1 for result in results if result['error'])
+        print(f"合計: 承認 {totals['approved']}件 / 却下 {totals['rejected']}件 / "
+              f"要手動審査 {totals['manual_review']}件 / エラー {errors}ファイル")
+        cache_stats = [result['cache_stats'] for result in results if result['cache_stats']]
+        hits = sum(h for h, _ in cache_stats)
+        lookups = sum(h + m for h, m in cache_stats)
+        if lookups:
+            print(f"判定キャッシュ: ヒット {hits}/{lookups}件 ({hits * 100 / lookups:.1f}%)")
     print(f"{'='*60}")
     
     return 0
 
-
 if __name__ == '__main__':
     sys.exit(main())